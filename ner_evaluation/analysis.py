@@ -0,0 +1,240 @@
+"""
+Error analysis collected by Evaluator in its single pass over the documents.
+
+Each analysis observes the matches of every document, as returned by
+match_named_entities, and keeps a summary of them whose size does not depend
+on the number of documents.
+"""
+
+import heapq
+import random
+
+from .ner_eval import SCENARIO_METRICS
+from .ner_eval import SCENARIOS
+from .ner_eval import compute_actual_possible
+from .ner_eval import compute_precision_recall
+
+WORST_BY = ('errors', 'f1')
+
+
+def document_metrics(scenario_counts, eval_schema):
+    """
+    Computes the metrics of a single document under one schema.
+
+    :param scenario_counts: the number of entities of the document in each of
+        the SCENARIOS
+    :param eval_schema: one of SCHEMAS
+    :return: a dict with the metrics of the document, plus its F1 and its
+        number of errors: the entities which are not correct
+    """
+
+    metrics = dict.fromkeys(('correct', 'incorrect', 'partial', 'missed', 'spurious'), 0)
+
+    for count, metric in zip(scenario_counts, SCENARIO_METRICS[eval_schema]):
+        metrics[metric] += count
+
+    metrics = compute_actual_possible(metrics)
+    metrics = compute_precision_recall(metrics, eval_schema in ('partial', 'ent_type'))
+
+    precision, recall = metrics['precision'], metrics['recall']
+
+    metrics['f1'] = 2 * precision * recall / (precision + recall) if precision + recall else 0
+    metrics['errors'] = metrics['incorrect'] + metrics['partial'] + metrics['missed'] + \
+        metrics['spurious']
+
+    return metrics
+
+
+class WorstDocuments():
+    """
+    The k documents with the most errors, or the lowest F1, in a heap.
+    """
+
+    def __init__(self, k, eval_schema='strict', by='errors'):
+        """
+        :param k: the number of documents to keep
+        :param eval_schema: the schema the errors are counted under
+        :param by: 'errors' to rank documents by their number of errors, 'f1'
+            by their F1, then by their number of errors
+        """
+
+        if k < 1:
+            raise ValueError("At least one document must be kept")
+
+        if eval_schema not in SCENARIO_METRICS:
+            raise ValueError(
+                "Unknown schema %r, expected one of %s" % (eval_schema, tuple(SCENARIO_METRICS))
+            )
+
+        if by not in WORST_BY:
+            raise ValueError("Unknown ranking %r, expected one of %s" % (by, WORST_BY))
+
+        self.k = k
+        self.eval_schema = eval_schema
+        self.by = by
+
+        # A min-heap of (badness, -document, scenario counts), so that its
+        # first entry is the best of the worst documents, and that on a tie
+        # the earlier document is kept.
+
+        self.heap = []
+
+    def observe(self, document, matches):
+
+        scenario_counts = [0] * len(SCENARIOS)
+
+        for scenario, _, _ in matches:
+            scenario_counts[scenario] += 1
+
+        metrics = document_metrics(scenario_counts, self.eval_schema)
+
+        # Documents without any error are never among the worst
+
+        if not metrics['errors']:
+            return
+
+        if self.by == 'errors':
+            badness = (metrics['errors'],)
+        else:
+            badness = (1 - metrics['f1'], metrics['errors'])
+
+        entry = (badness, -document, tuple(scenario_counts))
+
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, entry)
+
+        elif entry > self.heap[0]:
+            heapq.heapreplace(self.heap, entry)
+
+    def results(self):
+        """
+        :return: the worst documents, worst first, each one as a dict with its
+            index, its metrics under the schema and its scenario counts
+        """
+
+        return [
+            dict(
+                document_metrics(scenario_counts, self.eval_schema),
+                document=-negative_document,
+                scenarios=dict(zip(SCENARIOS, scenario_counts)),
+            )
+            for _, negative_document, scenario_counts in sorted(self.heap, reverse=True)
+        ]
+
+
+class ScenarioSamples():
+    """
+    A uniform sample of the entities of each scenario and entity type, kept in
+    one fixed size reservoir per (scenario, type).
+    """
+
+    def __init__(self, size, seed=None):
+        """
+        :param size: the number of entities kept for each scenario and type
+        :param seed: the seed of the random number generator
+        """
+
+        if size < 1:
+            raise ValueError("At least one entity must be kept")
+
+        self.size = size
+        self.rng = random.Random(seed)
+
+        # For each (scenario, type), the number of entities seen so far and
+        # the reservoir of (document, true, pred) samples.
+
+        self.seen = {}
+        self.reservoirs = {}
+
+    def observe(self, document, matches):
+
+        size = self.size
+
+        for scenario, true, pred in matches:
+
+            # As in the counts, spurious entities belong to the predicted type
+
+            key = (scenario, pred.e_type if true is None else true.e_type)
+
+            seen = self.seen.get(key, 0) + 1
+            self.seen[key] = seen
+
+            if seen <= size:
+                self.reservoirs.setdefault(key, []).append((document, true, pred))
+
+            else:
+
+                # Algorithm R: the n-th entity replaces a sample with
+                # probability size / n
+
+                i = self.rng.randrange(seen)
+
+                if i < size:
+                    self.reservoirs[key][i] = (document, true, pred)
+
+    def results(self):
+        """
+        :return: a dict mapping each scenario to a dict mapping each entity type
+            to its samples, as (document, true, pred) tuples of the index of the
+            document and the true and predicted Entity named-tuples, None when
+            the scenario has no true or no predicted entity
+        """
+
+        samples = {scenario: {} for scenario in SCENARIOS}
+
+        for (scenario, e_type), reservoir in sorted(self.reservoirs.items()):
+            samples[SCENARIOS[scenario]][e_type] = sorted(reservoir, key=lambda sample: sample[0])
+
+        return samples
+
+
+# The row, or column, of the confusion matrix for missing entities
+
+NONE = 'none'
+
+
+class ConfusionMatrix():
+    """
+    The number of predictions of each type made on true entities of each type,
+    as a flat list of counts with one row per true type and one column per
+    predicted type. The last row counts spurious predictions, which hit no true
+    entity, and the last column missed true entities.
+    """
+
+    def __init__(self, tag_index):
+        """
+        :param tag_index: maps each entity type to evaluate to its row, and its
+            column, in the matrix
+        """
+
+        self.tag_index = tag_index
+        self.size = len(tag_index) + 1
+        self.counts = [0] * (self.size * self.size)
+
+    def observe(self, document, matches):
+
+        tag_index = self.tag_index
+        size = self.size
+        counts = self.counts
+        none = size - 1
+
+        for _, true, pred in matches:
+            row = none if true is None else tag_index[true.e_type]
+            column = none if pred is None else tag_index[pred.e_type]
+            counts[row * size + column] += 1
+
+    def results(self):
+        """
+        :return: a dict mapping each true type, and 'none', to a dict mapping
+            each predicted type, and 'none', to the number of predictions
+        """
+
+        labels = list(self.tag_index) + [NONE]
+
+        return {
+            true_type: {
+                pred_type: self.counts[row * self.size + column]
+                for column, pred_type in enumerate(labels)
+            }
+            for row, true_type in enumerate(labels)
+        }
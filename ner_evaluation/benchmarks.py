@@ -0,0 +1,309 @@
+"""
+Benchmarks of the evaluator, with scaling curves along each dimension of the
+input: the number of documents, their length, the density of entities and the
+number of entity types.
+
+Each run times every target on a base corpus, then along each dimension in
+turn with the others held at their base value, and appends its timings to a
+JSON lines history file. Two runs of the history can then be compared:
+
+    python -m ner_evaluation.benchmarks run --history benchmarks.jsonl
+    python -m ner_evaluation.benchmarks compare --history benchmarks.jsonl
+
+compare exits with status 1 when a benchmark got slower than the threshold.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+
+from .cache import GoldCache
+from .ner_eval import Evaluator
+from .ner_eval import collect_named_entities
+from .ner_eval import compute_metrics
+from .synthetic import generate_corpus
+
+BASE = {'documents': 1000, 'length': 25, 'density': 0.2, 'types': 4}
+
+SWEEPS = {
+    'documents': (100, 1000, 10000),
+    'length': (10, 25, 100),
+    'density': (0.05, 0.2, 0.5),
+    'types': (2, 4, 16),
+}
+
+QUICK_SWEEPS = {
+    'documents': (10, 100),
+    'length': (10, 25),
+    'density': (0.05, 0.2),
+    'types': (2, 4),
+}
+
+
+def _collect_named_entities(corpus):
+    for tokens in corpus['true']:
+        collect_named_entities(tokens)
+
+
+def _compute_metrics(corpus):
+    for true_named_entities, pred_named_entities in corpus['entities']:
+        compute_metrics(true_named_entities, pred_named_entities, corpus['tags'])
+
+
+def _evaluate(corpus):
+    Evaluator(corpus['true'], corpus['pred'], corpus['tags']).evaluate()
+
+
+def _evaluate_numpy(corpus):
+    Evaluator(corpus['true'], corpus['pred'], corpus['tags'], engine='numpy').evaluate()
+
+
+def _gold_cache_hit(corpus):
+    corpus['cache'].decode(corpus['true'])
+
+
+TARGETS = {
+    'collect_named_entities': _collect_named_entities,
+    'compute_metrics': _compute_metrics,
+    'evaluate': _evaluate,
+    'evaluate_numpy': _evaluate_numpy,
+    'gold_cache_hit': _gold_cache_hit,
+}
+
+
+def available_targets():
+    """
+    :return: the names of the targets which can run here, evaluate_numpy
+        needing numpy
+    """
+
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return [name for name in TARGETS if name != 'evaluate_numpy']
+
+    return list(TARGETS)
+
+
+def time_target(target, corpus, repeat=5):
+    """
+    :param target: a function of the corpus
+    :param corpus: a dict with the true and predicted documents, the entity
+        types, and the decoded entities of each document
+    :return: the best time, in seconds, of repeat calls to a target
+    """
+
+    timings = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        target(corpus)
+        timings.append(time.perf_counter() - start)
+
+    return min(timings)
+
+
+def run(targets=None, sweeps=SWEEPS, repeat=5, seed=0, base=BASE, scenarios=None):
+    """
+    Runs the benchmarks.
+
+    :param targets: the names of the targets to time, by default all the ones
+        available
+    :param sweeps: the values of each dimension to time the targets at
+    :param repeat: the number of times each benchmark is run, the best time
+        being kept
+    :param seed: the seed of the generated corpora
+    :param base: the value of each dimension when it is not being swept
+    :param scenarios: the proportions of the scenarios in the generated
+        corpora, see synthetic.generate_documents
+    :return: a run record, with one entry per benchmark in 'results'
+    """
+
+    targets = targets or available_targets()
+
+    # The base configuration is shared by all the sweeps, only time it once
+
+    configurations = {}
+
+    for dimension, values in sweeps.items():
+        for value in values:
+            configuration = dict(base, **{dimension: value})
+            configurations[tuple(sorted(configuration.items()))] = configuration
+
+    results = []
+
+    # Cache hits are timed on a cache primed with each corpus, in a directory
+    # removed after the run
+
+    with tempfile.TemporaryDirectory() as directory:
+
+        cache = GoldCache(directory)
+
+        for configuration in configurations.values():
+
+            tags = ['T%d' % i for i in range(configuration['types'])]
+            true, pred = generate_corpus(
+                configuration['documents'],
+                length=configuration['length'],
+                density=configuration['density'],
+                types=tags,
+                scenarios=scenarios,
+                seed=seed,
+            )
+            n_tokens = sum(map(len, true))
+
+            # compute_metrics is timed on entities decoded beforehand
+
+            corpus = {
+                'true': true,
+                'pred': pred,
+                'tags': tags,
+                'entities': [
+                    (collect_named_entities(true_ents), collect_named_entities(pred_ents))
+                    for true_ents, pred_ents in zip(true, pred)
+                ],
+                'cache': cache,
+            }
+
+            if 'gold_cache_hit' in targets:
+                cache.decode(true)
+
+            for name in targets:
+                seconds = time_target(TARGETS[name], corpus, repeat)
+                results.append(dict(
+                    configuration,
+                    target=name,
+                    seconds=seconds,
+                    tokens_per_second=n_tokens / seconds if seconds else None,
+                ))
+
+    return {
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'repeat': repeat,
+        'results': results,
+    }
+
+
+def benchmark_key(result):
+    return (result['target'],) + tuple(result[dimension] for dimension in BASE)
+
+
+def compare(baseline, current, threshold=0.1):
+    """
+    Compares the timings of two runs.
+
+    :param baseline: the earlier run record
+    :param current: the later run record
+    :param threshold: the relative slowdown above which a benchmark regressed
+    :return: one (benchmark key, baseline seconds, current seconds, ratio,
+        regressed) tuple per benchmark in both runs
+    """
+
+    baseline_seconds = {benchmark_key(result): result['seconds'] for result in baseline['results']}
+    comparison = []
+
+    for result in current['results']:
+
+        key = benchmark_key(result)
+
+        if key not in baseline_seconds:
+            continue
+
+        before, after = baseline_seconds[key], result['seconds']
+        ratio = after / before if before else float('inf')
+        comparison.append((key, before, after, ratio, ratio > 1 + threshold))
+
+    return comparison
+
+
+def read_history(path):
+    """
+    :return: the run records of a history file, oldest first
+    """
+
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def append_history(path, record):
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record) + '\n')
+
+
+def format_comparison(comparison):
+
+    lines = ['\t'.join(('target',) + tuple(BASE) + ('baseline', 'current', 'ratio', ''))]
+
+    for key, before, after, ratio, regressed in comparison:
+        lines.append('\t'.join(
+            [str(value) for value in key]
+            + ['%.6f' % before, '%.6f' % after, '%.3f' % ratio, 'REGRESSION' if regressed else '']
+        ))
+
+    return '\n'.join(lines) + '\n'
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(
+        prog='python -m ner_evaluation.benchmarks',
+        description="Benchmark the evaluator, and compare runs to catch regressions.",
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help="run the benchmarks")
+    run_parser.add_argument('--history', default='benchmarks.jsonl',
+                            help="JSON lines file the run is appended to")
+    run_parser.add_argument('--targets', help="comma separated targets, by default all of them")
+    run_parser.add_argument('--repeat', type=int, default=5)
+    run_parser.add_argument('--seed', type=int, default=0)
+    run_parser.add_argument('--quick', action='store_true', help="run small corpora only")
+
+    compare_parser = subparsers.add_parser('compare', help="compare two runs of the history")
+    compare_parser.add_argument('--history', default='benchmarks.jsonl')
+    compare_parser.add_argument('--baseline', type=int, default=-2,
+                                help="index of the baseline run in the history")
+    compare_parser.add_argument('--current', type=int, default=-1,
+                                help="index of the current run in the history")
+    compare_parser.add_argument('--threshold', type=float, default=0.1,
+                                help="relative slowdown reported as a regression")
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+
+        targets = args.targets.split(',') if args.targets else None
+
+        for name in targets or ():
+            if name not in TARGETS:
+                parser.error("unknown target %r, expected one of %s" % (name, ', '.join(TARGETS)))
+
+        record = run(targets, QUICK_SWEEPS if args.quick else SWEEPS, args.repeat, args.seed)
+        append_history(args.history, record)
+
+        json.dump(record, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+
+        return 0
+
+    history = read_history(args.history)
+
+    try:
+        baseline, current = history[args.baseline], history[args.current]
+    except IndexError:
+        parser.error("%s does not hold the runs to compare" % args.history)
+
+    comparison = compare(baseline, current, args.threshold)
+
+    sys.stdout.write(format_comparison(comparison))
+
+    return 1 if any(regressed for *_, regressed in comparison) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
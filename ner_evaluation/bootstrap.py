@@ -0,0 +1,108 @@
+"""
+Bootstrap confidence intervals for precision, recall and F1.
+
+Entities are matched once, giving the scenario counts of every document. Each
+resample of the corpus is then a vector of weights, how many times each
+document was drawn, and the counts of a batch of resamples are a single matrix
+product of those weights with the document counts.
+"""
+
+from itertools import chain
+
+import numpy as np
+
+from .decoding import resolve_scheme
+from .ner_eval import SCHEMAS
+from .vectorized import compute_document_counts
+from .vectorized import compute_scores
+
+
+def bootstrap_from_counts(document_counts, tags, n_resamples=1000, confidence=0.95, seed=None,
+                          batch_size=100):
+    """
+    Computes confidence intervals from the scenario counts of every document.
+
+    :param document_counts: an array with one row of counts per document, as
+        returned by compute_document_counts
+    :param tags: the entity types the counts refer to
+    :param n_resamples: the number of bootstrap resamples
+    :param confidence: the confidence level of the intervals
+    :param seed: the seed of the random number generator
+    :param batch_size: the number of resamples drawn at a time, which bounds
+        the memory used to batch_size * number of documents weights
+    :return: the overall intervals and the intervals by entity type, as
+        results[schema][metric] = {'value': ..., 'low': ..., 'high': ...} for
+        the metrics precision, recall and f1
+    """
+
+    if n_resamples < 1:
+        raise ValueError("At least one resample is needed")
+
+    tags = list(dict.fromkeys(tags))
+    document_counts = np.asarray(document_counts)
+    n_documents = len(document_counts)
+
+    if n_documents == 0:
+        raise ValueError("At least one document is needed to resample the corpus")
+
+    rng = np.random.default_rng(seed)
+
+    resampled = []
+
+    for start in range(0, n_resamples, batch_size):
+        weights = rng.multinomial(
+            n_documents, np.full(n_documents, 1 / n_documents),
+            size=min(batch_size, n_resamples - start),
+        )
+        resampled.append(weights @ document_counts)
+
+    values = compute_scores(document_counts.sum(axis=0), len(tags))
+    scores = compute_scores(np.concatenate(resampled), len(tags))
+
+    alpha = (1 - confidence) / 2
+
+    intervals = [
+        {
+            'value': value,
+            'low': np.quantile(score, alpha, axis=0),
+            'high': np.quantile(score, 1 - alpha, axis=0),
+        }
+        for value, score in zip(values, scores)
+    ]
+
+    def to_results(row):
+        return {
+            eval_schema: {
+                metric: {bound: float(interval[bound][row, j]) for bound in interval}
+                for metric, interval in zip(('precision', 'recall', 'f1'), intervals)
+            }
+            for j, eval_schema in enumerate(SCHEMAS)
+        }
+
+    results = to_results(0)
+    results_agg = {e_type: to_results(i + 1) for i, e_type in enumerate(tags)}
+
+    return results, results_agg
+
+
+def bootstrap(true, pred, tags, n_resamples=1000, confidence=0.95, seed=None, batch_size=100,
+              scheme='BIO'):
+    """
+    Computes bootstrap confidence intervals for precision, recall and F1 under
+    each schema, overall and by entity type.
+
+    :param true: a list of documents, each one a list of true tags
+    :param pred: a list of documents, each one a list of predicted tags
+    :param tags: the entity types to evaluate
+    :param scheme: the tagging scheme of the documents, one of decoding.SCHEMES,
+        or 'auto' to detect it from the documents
+    :return: see bootstrap_from_counts
+    """
+
+    scheme = resolve_scheme(scheme, chain(true, pred))
+
+    document_counts = compute_document_counts(true, pred, tags, scheme)
+
+    return bootstrap_from_counts(
+        document_counts, tags, n_resamples, confidence, seed, batch_size
+    )
@@ -0,0 +1,283 @@
+"""
+Persistent on-disk cache of decoded true entities.
+
+The entities of a set of true documents are stored in a compact binary file,
+named after a hash of the tags of the documents and the tagging scheme, so that
+fixed benchmark corpora are only decoded once. Files hold a small JSON header
+followed by int32 arrays, which are read through a memory map and kept as they
+are, the entities of a document only being built when it is read. The cache is
+bounded in size, evicting the least recently used files first.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from collections.abc import Sequence
+from itertools import accumulate
+
+from .decoding import entity_decoder
+from .decoding import resolve_scheme
+from .ner_eval import Entity
+
+MAGIC = b'NERGOLD1'
+SUFFIX = '.gold'
+
+
+class GoldCache():
+
+    def __init__(self, directory, max_bytes=1 << 30):
+        """
+        :param directory: the directory the cache files are stored in
+        :param max_bytes: the maximum total size of the cache files
+        """
+
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, true, scheme='BIO'):
+        """
+        Content hash of a list of true documents and the scheme of their tags.
+        """
+
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(scheme.encode('utf-8') + b'\n')
+
+        for true_ents in true:
+            digest.update('\t'.join(true_ents).encode('utf-8') + b'\n')
+
+        return digest.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + SUFFIX)
+
+    def decode(self, true, scheme='BIO'):
+        """
+        Decodes the entities of true documents, reading them from the cache
+        when they were decoded before.
+
+        :param true: a list of documents, each one a list of true tags
+        :param scheme: the scheme of the tags, one of decoding.SCHEMES, or
+            'auto' to detect it from the documents
+        :return: the length of each document, and the list of Entity
+            named-tuples of each document, as a CachedEntities when they are
+            read from the cache
+        """
+
+        scheme = resolve_scheme(scheme, true)
+        key = self.key(true, scheme)
+        cached = self.load(key)
+
+        if cached is not None:
+            return cached
+
+        lengths = [len(true_ents) for true_ents in true]
+        decode = entity_decoder(scheme)
+        entities = [decode(true_ents) for true_ents in true]
+
+        self.store(key, lengths, entities)
+
+        return lengths, entities
+
+    def load(self, key):
+        """
+        :return: the document lengths and a CachedEntities of the entities
+            stored under key, or None when they are not in the cache. A file which cannot be read, such
+            as one left truncated by a crash, is removed and is also a miss.
+        """
+
+        path = self.path(key)
+
+        try:
+            f = open(path, 'rb')
+        except FileNotFoundError:
+            return None
+
+        try:
+            with f:
+                cached = self._read(f)
+
+        except (ValueError, IndexError, KeyError, TypeError, struct.error):
+            cached = None
+
+        if cached is None:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+            return None
+
+        # Mark the file as recently used
+
+        os.utime(path)
+
+        return cached
+
+    def _read(self, f):
+        """
+        Parses a cache file.
+
+        :return: the document lengths and entities it holds, or None when it
+            is not a valid cache file for this machine
+        """
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+
+            if data[:len(MAGIC)] != MAGIC:
+                return None
+
+            header_length, = struct.unpack_from('<I', data, len(MAGIC))
+            offset = len(MAGIC) + 4
+            header = json.loads(data[offset:offset + header_length].decode('utf-8'))
+
+            if header['byteorder'] != sys.byteorder:
+                return None
+
+            n_documents, n_entities = header['documents'], header['entities']
+            types = header['types']
+
+            offset += header_length
+            offset += -offset % 4
+
+            # A truncated file, or one whose header does not match its data,
+            # must not be sliced.
+
+            if len(data) - offset != 4 * (2 * n_documents + 3 * n_entities):
+                return None
+
+            # The int32 arrays are copied as they are, entities are only built
+            # when their document is read, see CachedEntities.
+
+            columns = []
+
+            for n in (n_documents, n_documents, n_entities, n_entities, n_entities):
+                column = array('i')
+                column.frombytes(data[offset:offset + 4 * n])
+                columns.append(column)
+                offset += 4 * n
+
+        lengths, n_document_entities, type_ids, starts, ends = columns
+
+        if sum(n_document_entities) != n_entities:
+            return None
+
+        if type_ids and not 0 <= min(type_ids) <= max(type_ids) < len(types):
+            return None
+
+        offsets = list(accumulate(n_document_entities, initial=0))
+
+        return lengths.tolist(), CachedEntities(types, type_ids, starts, ends, offsets)
+
+    def store(self, key, lengths, entities):
+        """
+        Stores document lengths and entities under key, then evicts the least
+        recently used files until the cache fits in max_bytes.
+        """
+
+        types = {}
+        type_ids, starts, ends = array('i'), array('i'), array('i')
+
+        for document in entities:
+            for ent in document:
+                type_ids.append(types.setdefault(ent.e_type, len(types)))
+                starts.append(ent.start_offset)
+                ends.append(ent.end_offset)
+
+        header = json.dumps({
+            'types': list(types),
+            'documents': len(lengths),
+            'entities': len(starts),
+            'byteorder': sys.byteorder,
+        }).encode('utf-8')
+
+        offset = len(MAGIC) + 4 + len(header)
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+
+        with os.fdopen(fd, 'wb') as f:
+            f.write(MAGIC)
+            f.write(struct.pack('<I', len(header)))
+            f.write(header)
+            f.write(b'\0' * (-offset % 4))
+            array('i', lengths).tofile(f)
+            array('i', (len(document) for document in entities)).tofile(f)
+            type_ids.tofile(f)
+            starts.tofile(f)
+            ends.tofile(f)
+
+        os.replace(tmp_path, self.path(key))
+
+        self.evict()
+
+    def evict(self):
+        """
+        Removes the least recently used files until the cache fits in max_bytes.
+        """
+
+        files = []
+
+        for name in os.listdir(self.directory):
+            if name.endswith(SUFFIX):
+                stat = os.stat(os.path.join(self.directory, name))
+                files.append((stat.st_mtime, stat.st_size, name))
+
+        total = sum(size for _, size, _ in files)
+
+        for _, size, name in sorted(files):
+
+            if total <= self.max_bytes:
+                break
+
+            os.remove(os.path.join(self.directory, name))
+            total -= size
+
+
+class CachedEntities(Sequence):
+    """
+    The entities of each document read from a cache file, held as int32
+    columns. Reading a document builds its list of Entity named-tuples, so that
+    a cache hit costs no more than copying the columns.
+    """
+
+    def __init__(self, types, type_ids, starts, ends, offsets):
+        """
+        :param types: the entity type of each type id
+        :param type_ids: the type id of every entity, document after document
+        :param starts: the start offset of every entity
+        :param ends: the end offset of every entity
+        :param offsets: the index of the first entity of each document, followed
+            by the number of entities
+        """
+
+        self.types = types
+        self.type_ids = type_ids
+        self.starts = starts
+        self.ends = ends
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, document):
+
+        if isinstance(document, slice):
+            return [self[i] for i in range(len(self))[document]]
+
+        # Also checks the bounds, and turns negative indices into positive ones
+
+        document = range(len(self))[document]
+        first, last = self.offsets[document], self.offsets[document + 1]
+
+        return list(map(
+            Entity,
+            map(self.types.__getitem__, self.type_ids[first:last]),
+            self.starts[first:last],
+            self.ends[first:last],
+        ))
@@ -0,0 +1,94 @@
+"""
+Command line interface, evaluating CoNLL-style column files:
+
+    python -m ner_evaluation gold.conll pred.conll --tags PER,LOC,ORG,MISC
+
+or, when a single file holds the true and the predicted tags in its last two
+columns:
+
+    python -m ner_evaluation predictions.conll.gz --tags PER,LOC --jobs 8
+"""
+
+import argparse
+import json
+import sys
+
+from .conll import read_conll
+from .conll import read_conll_pair
+from .decoding import SCHEMES
+from .ner_eval import ENGINES
+from .ner_eval import Evaluator
+
+METRICS = ('correct', 'incorrect', 'partial', 'missed', 'spurious', 'possible', 'actual',
+           'precision', 'recall')
+
+
+def format_tsv(results, results_agg):
+    """
+    Formats results as tab separated values, with one row per entity type and
+    evaluation schema. The overall results have the entity type ALL.
+    """
+
+    lines = ['\t'.join(('entity_type', 'schema') + METRICS)]
+
+    for e_type, type_results in [('ALL', results)] + list(results_agg.items()):
+        for eval_schema in ('strict', 'exact', 'partial', 'ent_type'):
+            values = [str(type_results[eval_schema][metric]) for metric in METRICS]
+            lines.append('\t'.join([e_type, eval_schema] + values))
+
+    return '\n'.join(lines) + '\n'
+
+
+def format_json(results, results_agg):
+
+    return json.dumps({'results': results, 'results_agg': results_agg}, indent=2) + '\n'
+
+
+FORMATS = {'json': format_json, 'tsv': format_tsv}
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(
+        prog='ner-eval',
+        description="Evaluate named-entity recognition predictions in CoNLL-style column files.",
+    )
+    parser.add_argument('gold', help="file with the true tags, or with both the true and "
+                                     "the predicted tags when pred is not given")
+    parser.add_argument('pred', nargs='?', help="file with the predicted tags")
+    parser.add_argument('--tags', required=True,
+                        help="comma separated entity types to evaluate, e.g. PER,LOC")
+    parser.add_argument('--jobs', type=int, default=1,
+                        help="number of worker processes, -1 to use all the CPUs")
+    parser.add_argument('--engine', choices=ENGINES, default='python')
+    parser.add_argument('--scheme', choices=SCHEMES + ('auto',), default='BIO',
+                        help="tagging scheme, 'auto' detects it from the first documents")
+    parser.add_argument('--chunksize', type=int, default=1000,
+                        help="number of documents evaluated at a time by each worker")
+    parser.add_argument('--prefetch', type=int, default=64,
+                        help="number of documents read ahead in a background thread")
+    parser.add_argument('--format', choices=sorted(FORMATS), default='json')
+    parser.add_argument('--output', '-o', help="file to write the metrics to, by default stdout")
+
+    args = parser.parse_args(argv)
+
+    if args.pred:
+        documents = read_conll_pair(args.gold, args.pred, prefetch=args.prefetch)
+    else:
+        documents = read_conll(args.gold, prefetch=args.prefetch)
+
+    evaluator = Evaluator(
+        tags=[e_type.strip() for e_type in args.tags.split(',') if e_type.strip()],
+        engine=args.engine,
+        scheme=args.scheme,
+        n_jobs=args.jobs,
+        chunksize=args.chunksize,
+    )
+
+    output = FORMATS[args.format](*evaluator.evaluate_stream(documents))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        sys.stdout.write(output)
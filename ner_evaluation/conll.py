@@ -0,0 +1,185 @@
+"""
+Streaming readers for CoNLL-style column files.
+
+Each line holds one token and its tags in whitespace separated columns, and
+documents (usually sentences) are separated by blank lines. Files ending in .gz
+or .zst are decompressed on the fly, the latter needs the zstandard package.
+
+The readers yield the tags of one document at a time, so they can be passed
+straight to Evaluator.evaluate_stream:
+
+    evaluator = Evaluator(tags=['LOC', 'PER'])
+    evaluator.evaluate_stream(read_conll('predictions.conll'))
+"""
+
+import gzip
+import io
+import queue
+import threading
+
+BUFFER_SIZE = 1 << 20
+
+
+def open_text(path, buffer_size=BUFFER_SIZE):
+    """
+    Opens a, possibly compressed, text file for reading with a large buffer.
+    """
+
+    path = str(path)
+
+    if path.endswith('.gz'):
+        raw = gzip.open(path, 'rb')
+
+    elif path.endswith('.zst'):
+
+        # Imported here, so that zstandard is only needed for .zst files
+
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError("Reading .zst files requires the zstandard package")
+
+        raw = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+
+    else:
+        raw = open(path, 'rb', buffering=0)
+
+    return io.TextIOWrapper(io.BufferedReader(raw, buffer_size), encoding='utf-8')
+
+
+def read_conll(path, columns=(-2, -1), buffer_size=BUFFER_SIZE, prefetch=0):
+    """
+    Reads the tags of each document in a column file.
+
+    :param path: the file to read
+    :param columns: the indices of the columns to read, by default the last two
+        which usually hold the true and the predicted tags
+    :param buffer_size: the size of the reads from the file
+    :param prefetch: if greater than zero, the file is read and parsed in a
+        background thread, up to this many documents ahead
+    :return: an iterator over tuples with one list of tags per column
+    """
+
+    if prefetch > 0:
+        return _prefetch(read_conll(path, columns, buffer_size), prefetch)
+
+    return _read_conll(path, columns, buffer_size)
+
+
+def _read_conll(path, columns, buffer_size):
+
+    with open_text(path, buffer_size) as f:
+
+        document = tuple([] for _ in columns)
+
+        for line in f:
+
+            fields = line.split()
+
+            if fields and fields[0] != '-DOCSTART-':
+                for tags, column in zip(document, columns):
+                    tags.append(fields[column])
+
+            elif document[0]:
+                yield document
+                document = tuple([] for _ in columns)
+
+        if document[0]:
+            yield document
+
+
+def read_conll_pair(true_path, pred_path, column=-1, buffer_size=BUFFER_SIZE, prefetch=0):
+    """
+    Reads the true and predicted tags of each document from two column files,
+    which must hold the same documents in the same order.
+
+    :param true_path: the file with the true tags
+    :param pred_path: the file with the predicted tags
+    :param column: the index of the column with the tags in both files
+    :param buffer_size: the size of the reads from each file
+    :param prefetch: if greater than zero, each file is read and parsed in a
+        background thread, up to this many documents ahead
+    :return: an iterator over (true tags, predicted tags) pairs
+    """
+
+    true_docs = read_conll(true_path, (column,), buffer_size, prefetch)
+    pred_docs = read_conll(pred_path, (column,), buffer_size, prefetch)
+
+    missing = object()
+
+    # Close both readers however this ends, so that their files are closed
+    # and their prefetching threads stop.
+
+    try:
+        while True:
+
+            true_doc = next(true_docs, missing)
+            pred_doc = next(pred_docs, missing)
+
+            if true_doc is missing and pred_doc is missing:
+                return
+
+            if true_doc is missing or pred_doc is missing:
+                raise ValueError("Number of predicted documents does not equal true")
+
+            yield true_doc[0], pred_doc[0]
+
+    finally:
+        true_docs.close()
+        pred_docs.close()
+
+
+def _prefetch(iterator, size, timeout=0.1):
+    """
+    Consumes an iterator in a background thread, so that reading and
+    decompressing a file overlaps with evaluating the documents already read.
+
+    When the consumer stops early, by an error or by abandoning the generator,
+    the producer notices within timeout seconds, stops and closes the iterator,
+    and with it the file.
+    """
+
+    buffer = queue.Queue(maxsize=size)
+    stop = threading.Event()
+    done = object()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=timeout)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for item in iterator:
+                if not put(item):
+                    return
+        except BaseException as e:
+            put(e)
+        else:
+            put(done)
+        finally:
+            close = getattr(iterator, 'close', None)
+            if close is not None:
+                close()
+
+    threading.Thread(target=produce, name='ner-evaluation-prefetch', daemon=True).start()
+
+    try:
+        while True:
+
+            item = buffer.get()
+
+            if item is done:
+                return
+
+            if isinstance(item, BaseException):
+                raise item
+
+            yield item
+
+    finally:
+        stop.set()
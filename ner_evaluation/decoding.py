@@ -0,0 +1,241 @@
+"""
+Table-driven decoding of entities from tags, for the common tagging schemes:
+
+- BIO: B- begins an entity, I- continues it, O is outside any entity
+- IO: I- begins or continues an entity, O is outside any entity
+- BIOES: as BIO, plus E- ends an entity and S- is a single token entity
+- BILOU: the same as BIOES, with L- (last) and U- (unit) instead of E- and S-
+
+Each distinct tag is interned to an integer id the first time it is seen, and
+every (open entity type, tag id) pair is compiled into an integer transition
+code, so that the decoding loop does no string operation.
+"""
+
+from .ner_eval import Entity
+from .ner_eval import collect_named_entities
+
+SCHEMES = ('BIO', 'IO', 'BIOES', 'BILOU')
+
+# Bits of a transition code. The next state, 0 outside any entity or the type
+# id + 1 of the open entity, is stored above them.
+
+CLOSE = 1   # the open entity ends on the previous token
+START = 2   # an entity starts on this token
+EMIT = 4    # the entity started ends on this token
+STATE_SHIFT = 3
+
+
+def detect_scheme(docs):
+    """
+    Detects the tagging scheme of documents, in a single pass over their tags.
+
+    :param docs: an iterable of documents, each one a list of tags
+    :return: one of SCHEMES, or None when the documents only hold 'O' tags,
+        which decode to no entity under any scheme
+    """
+
+    distinct_tags = set()
+
+    for doc in docs:
+        distinct_tags.update(doc)
+
+    prefixes = {tag[:1] for tag in distinct_tags if tag != 'O'}
+
+    if not prefixes:
+        return None
+
+    if prefixes & {'E', 'S'}:
+        return 'BIOES'
+
+    if prefixes & {'L', 'U'}:
+        return 'BILOU'
+
+    if 'B' not in prefixes:
+        return 'IO'
+
+    return 'BIO'
+
+
+def resolve_scheme(scheme, docs):
+    """
+    :param scheme: one of SCHEMES, or 'auto' to detect it from the documents
+    :param docs: an iterable of documents, each one a list of tags, only read
+        when scheme is 'auto'
+    :return: one of SCHEMES, 'BIO' when detecting it from documents which
+        only hold 'O' tags
+    """
+
+    if scheme == 'auto':
+        return detect_scheme(docs) or 'BIO'
+
+    if scheme not in SCHEMES:
+        raise ValueError("Unknown scheme %r, expected one of %s" % (scheme, SCHEMES))
+
+    return scheme
+
+
+def tag_rules(tag, scheme):
+    """
+    How a tag behaves under a scheme, from which all the transitions follow.
+
+    :param tag: a tag
+    :param scheme: one of SCHEMES
+    :return: whether an entity is still open after the tag, and whether the tag
+        continues an entity of its type open before it
+    """
+
+    if tag == 'O':
+        return False, False
+
+    prefix = tag[:1]
+
+    # As in collect_named_entities, any tag other than B- continues an open
+    # entity of the same type in BIO and IO.
+
+    if scheme in ('BIO', 'IO'):
+        return True, prefix != 'B'
+
+    return prefix not in ('E', 'S', 'L', 'U'), prefix in ('I', 'E', 'L')
+
+
+def entity_decoder(scheme):
+    """
+    :param scheme: one of SCHEMES
+    :return: a function creating a list of Entity named-tuples from a list of
+        tags in that scheme
+    """
+
+    if scheme == 'BIO':
+        return collect_named_entities
+
+    return TagDecoder(scheme).decode
+
+
+class _TagIds(dict):
+    """
+    Interns tags, compiling the transitions of each new tag into the decoder's
+    table.
+    """
+
+    def __init__(self, decoder):
+        super().__init__()
+        self.decoder = decoder
+
+    def __missing__(self, tag):
+        self[tag] = tag_id = self.decoder._add_tag(tag)
+        return tag_id
+
+
+class TagDecoder():
+
+    def __init__(self, scheme='BIO'):
+        """
+        :param scheme: one of SCHEMES
+        """
+
+        if scheme not in SCHEMES:
+            raise ValueError("Unknown scheme %r, expected one of %s" % (scheme, SCHEMES))
+
+        self.scheme = scheme
+
+        # The rules and the entity type id of each tag id, the name of each
+        # entity type id, and one row of transition codes per state.
+
+        self.tag_rules = []
+        self.tag_types = []
+        self.types = []
+        self.type_ids = {}
+        self.table = [[]]
+
+        self.tag_ids = _TagIds(self)
+
+    def _transition(self, state, tag_id):
+        """
+        The transition code from a state on a tag, see tag_rules.
+        """
+
+        opens, continues = self.tag_rules[tag_id]
+        tag_state = self.tag_types[tag_id] + 1
+        close = CLOSE if state else 0
+
+        if not tag_state:
+            return close
+
+        if continues and state == tag_state:
+            return tag_state << STATE_SHIFT if opens else EMIT
+
+        return close | START | (tag_state << STATE_SHIFT if opens else EMIT)
+
+    def _add_tag(self, tag):
+
+        tag_id = len(self.tag_rules)
+
+        self.tag_rules.append(tag_rules(tag, self.scheme))
+
+        if tag == 'O':
+            self.tag_types.append(-1)
+
+        else:
+            e_type = tag[2:]
+
+            if e_type not in self.type_ids:
+                self.type_ids[e_type] = len(self.types)
+                self.types.append(e_type)
+                self.table.append([
+                    self._transition(len(self.types), other) for other in range(tag_id)
+                ])
+
+            self.tag_types.append(self.type_ids[e_type])
+
+        for state, row in enumerate(self.table):
+            row.append(self._transition(state, tag_id))
+
+        return tag_id
+
+    def decode(self, tokens):
+        """
+        Creates a list of Entity named-tuples from a list of tags.
+
+        :param tokens: a list of tags
+        :return: a list of Entity named-tuples
+        """
+
+        table = self.table
+        types = self.types
+        tag_types = self.tag_types
+
+        named_entities = []
+        state = 0
+        start_offset = 0
+
+        # The code of staying in the current state, which most tokens do
+
+        row = table[0]
+        stay = 0
+
+        for offset, tag_id in enumerate(map(self.tag_ids.__getitem__, tokens)):
+
+            code = row[tag_id]
+
+            if code == stay:
+                continue
+
+            if code & CLOSE:
+                named_entities.append(Entity(types[state - 1], start_offset, offset - 1))
+
+            if code & START:
+                start_offset = offset
+
+            if code & EMIT:
+                named_entities.append(Entity(types[tag_types[tag_id]], start_offset, offset))
+
+            state = code >> STATE_SHIFT
+            row = table[state]
+            stay = state << STATE_SHIFT
+
+        # catches an entity that goes up until the last token
+
+        if state:
+            named_entities.append(Entity(types[state - 1], start_offset, len(tokens) - 1))
+
+        return named_entities
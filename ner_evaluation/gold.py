@@ -0,0 +1,144 @@
+"""
+Evaluation of many systems against the same true documents.
+
+The true documents are decoded, filtered by entity type and sorted once, in a
+GoldIndex, which is then used to evaluate the predictions of each system. The
+set of the true entities of each document is also built once, so that matching
+the predictions of a system does no work on the true entities beyond the sweep.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+from .decoding import entity_decoder
+from .decoding import resolve_scheme
+from .ner_eval import SCENARIOS
+from .ner_eval import compute_results_from_counts
+from .ner_eval import count_matches
+from .ner_eval import match_sorted_entities
+
+
+class GoldIndex():
+
+    def __init__(self, true, tags, cache=None, scheme='BIO'):
+        """
+        :param true: a list of documents, each one a list of true tags
+        :param tags: the entity types to evaluate
+        :param cache: an optional GoldCache, the decoded entities are read from
+            it when the same documents were decoded before
+        :param scheme: the tagging scheme of the true and predicted documents,
+            or 'auto' to detect it from the true documents
+        """
+
+        # The scheme is resolved first, so that the cache key holds the
+        # concrete scheme the documents are decoded with
+
+        scheme = resolve_scheme(scheme, true)
+
+        self.tags = tags
+        self.scheme = scheme
+        self.decode = entity_decoder(scheme)
+        self.tag_index = {e_type: i for i, e_type in enumerate(dict.fromkeys(tags))}
+
+        # Only the length of each document is needed to check predictions
+
+        if cache is not None:
+            self.lengths, entities = cache.decode(true, scheme)
+        else:
+            self.lengths = [len(true_ents) for true_ents in true]
+            entities = [self.decode(true_ents) for true_ents in true]
+
+        self.entities = [
+            sorted(
+                (ent for ent in true_named_entities if ent.e_type in self.tag_index),
+                key=lambda ent: ent.start_offset
+            )
+            for true_named_entities in entities
+        ]
+
+        self.entity_sets = [set(true_named_entities) for true_named_entities in self.entities]
+
+    def __len__(self):
+        return len(self.entities)
+
+    def count(self, pred):
+        """
+        Counts the scenarios of a system's predictions.
+
+        :param pred: a list of documents, each one a list of predicted tags
+        :return: a flat list of counts, as expected by compute_results_from_counts
+        """
+
+        if len(pred) != len(self):
+            raise ValueError("Number of predicted documents does not equal true")
+
+        counts = [0] * (len(self.tag_index) * len(SCENARIOS))
+
+        for length, true_named_entities, true_set, pred_ents in zip(
+                self.lengths, self.entities, self.entity_sets, pred):
+
+            if len(pred_ents) != length:
+                raise ValueError("Prediction length does not match true example length")
+
+            pred_named_entities = [
+                ent for ent in self.decode(pred_ents) if ent.e_type in self.tag_index
+            ]
+
+            count_matches(
+                match_sorted_entities(true_named_entities, pred_named_entities, true_set),
+                self.tag_index,
+                counts
+            )
+
+        return counts
+
+    def evaluate(self, pred):
+        """
+        Evaluates a system's predictions.
+
+        :param pred: a list of documents, each one a list of predicted tags
+        :return: the overall results and the results by entity type
+        """
+
+        return compute_results_from_counts(self.count(pred), self.tag_index)
+
+
+# The GoldIndex of each worker process, sent once when the worker starts
+# rather than with every system.
+
+_gold = None
+
+
+def _set_gold(gold):
+    global _gold
+    _gold = gold
+
+
+def _count_system(pred):
+    return _gold.count(pred)
+
+
+def evaluate_systems(gold, systems, n_jobs=1):
+    """
+    Evaluates the predictions of many systems against the same true documents.
+
+    :param gold: a GoldIndex of the true documents
+    :param systems: a dict mapping the name of each system to its predictions
+    :param n_jobs: the number of worker processes systems are evaluated in
+    :return: a dict mapping the name of each system to its overall results and
+        its results by entity type
+    """
+
+    names = list(systems)
+
+    if n_jobs == 1:
+        counts = [gold.count(systems[name]) for name in names]
+
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs if n_jobs > 0 else None,
+                                 initializer=_set_gold, initargs=(gold,)) as executor:
+            counts = list(executor.map(_count_system, (systems[name] for name in names)))
+
+    return {
+        name: compute_results_from_counts(system_counts, gold.tag_index)
+        for name, system_counts in zip(names, counts)
+    }
@@ -0,0 +1,84 @@
+"""
+Interval algebra over entity spans.
+
+Spans are any objects with start_offset and end_offset attributes, such as the
+Entity named-tuples, where both offsets are inclusive: Entity('PER', 3, 3) is a
+single token long. All the functions run in constant time and do not allocate.
+"""
+
+
+def span_length(span):
+    """
+    Number of tokens covered by a span.
+
+    >>> from ner_evaluation.ner_eval import Entity
+    >>> span_length(Entity('PER', 3, 5))
+    3
+    """
+
+    return max(0, span.end_offset - span.start_offset + 1)
+
+
+def overlap(span_a, span_b):
+    """
+    Whether two spans share at least one token.
+
+    >>> from ner_evaluation.ner_eval import Entity
+    >>> overlap(Entity('PER', 1, 2), Entity('PER', 2, 3))
+    True
+    >>> overlap(Entity('PER', 1, 2), Entity('PER', 3, 4))
+    False
+    """
+
+    return span_a.start_offset <= span_b.end_offset and span_b.start_offset <= span_a.end_offset
+
+
+def intersection_length(span_a, span_b):
+    """
+    Number of tokens shared by two spans.
+
+    >>> from ner_evaluation.ner_eval import Entity
+    >>> intersection_length(Entity('PER', 1, 5), Entity('LOC', 4, 9))
+    2
+    """
+
+    return max(0, min(span_a.end_offset, span_b.end_offset) -
+               max(span_a.start_offset, span_b.start_offset) + 1)
+
+
+def union_length(span_a, span_b):
+    """
+    Number of tokens covered by either of two spans.
+
+    >>> from ner_evaluation.ner_eval import Entity
+    >>> union_length(Entity('PER', 1, 5), Entity('LOC', 4, 9))
+    9
+    """
+
+    return span_length(span_a) + span_length(span_b) - intersection_length(span_a, span_b)
+
+
+def iou(span_a, span_b):
+    """
+    Intersection over union of two spans, between 0 and 1.
+
+    >>> from ner_evaluation.ner_eval import Entity
+    >>> iou(Entity('PER', 1, 5), Entity('LOC', 4, 9))
+    0.2222222222222222
+    """
+
+    union = union_length(span_a, span_b)
+
+    return intersection_length(span_a, span_b) / union if union > 0 else 0
+
+
+def contains(outer, inner):
+    """
+    Whether every token of inner is also in outer.
+
+    >>> from ner_evaluation.ner_eval import Entity
+    >>> contains(Entity('PER', 1, 5), Entity('PER', 2, 3))
+    True
+    """
+
+    return outer.start_offset <= inner.start_offset and inner.end_offset <= outer.end_offset
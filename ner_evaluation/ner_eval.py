@@ -1,64 +1,404 @@
 import logging
+import os
+import time
+from collections import deque
 from collections import namedtuple
 from copy import deepcopy
+from itertools import chain
+from itertools import islice
 
-logging.basicConfig(
-    format="%(asctime)s %(name)s %(levelname)s: %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
-    level="DEBUG",
-)
+from .intervals import overlap
+
+# Logging is left to the application to configure
+
+logger = logging.getLogger(__name__)
 
 Entity = namedtuple("Entity", "e_type start_offset end_offset")
 
+# The scenarios an entity can fall into, see
+# http://www.davidsbatista.net/blog/2018/05/09/Named_Entity_Evaluation/
+
+SCENARIOS = (
+    'exact_match',          # I: exact match between true and pred
+    'spurious',             # II: pred does not exist in the true entities
+    'missed',               # III: true entity was not predicted at all
+    'wrong_type',           # IV: offsets match, but entity type is wrong
+    'overlap',              # V: offsets overlap, entity type is the same
+    'overlap_wrong_type',   # VI: offsets overlap, entity type is different
+)
+
+EXACT_MATCH, SPURIOUS, MISSED, WRONG_TYPE, OVERLAP, OVERLAP_WRONG_TYPE = range(len(SCENARIOS))
+
+# How each scenario is scored under each of the evaluation schemas.
+
+SCENARIO_METRICS = {
+    'strict': ('correct', 'spurious', 'missed', 'incorrect', 'incorrect', 'incorrect'),
+    'ent_type': ('correct', 'spurious', 'missed', 'incorrect', 'correct', 'incorrect'),
+    'partial': ('correct', 'spurious', 'missed', 'correct', 'partial', 'partial'),
+    'exact': ('correct', 'spurious', 'missed', 'correct', 'incorrect', 'incorrect'),
+}
+
+SCHEMAS = tuple(SCENARIO_METRICS)
+
+ENGINES = ('python', 'numpy')
+
+# How documents are given: as lists of tags, as lists of (e_type, start_offset,
+# end_offset) spans, as (types, start_offsets, end_offsets) parallel arrays, or
+# as lists of (e_type, start, end) half-open character offset spans.
+
+INPUT_FORMATS = ('tags', 'spans', 'arrays', 'char_spans')
+
 class Evaluator():
 
-    def __init__(self, true, pred, tags):
+    def __init__(self, true=None, pred=None, tags=None, engine='python', n_jobs=1,
+                 chunksize=1000, input_format='tags', scheme='BIO', instrument=False,
+                 worst_k=None, worst_schema='strict', worst_by='errors', samples=None,
+                 seed=None, confusion=False):
         """
+        :param true: a list of documents, each one a list of true tags. Can be
+            left out when documents are passed to update, update_batch or
+            evaluate_stream instead.
+        :param pred: a list of documents, each one a list of predicted tags
+        :param tags: the entity types to evaluate
+        :param engine: 'python' evaluates one document at a time, 'numpy'
+            evaluates the whole corpus at once with array operations
+        :param n_jobs: the number of worker processes documents are sharded
+            across, -1 to use all the CPUs
+        :param chunksize: the number of documents in each shard, and in each
+            batch read by evaluate_stream
+        :param input_format: 'tags' when documents are lists of tags, 'spans'
+            when they are lists of Entity named-tuples or (e_type, start_offset,
+            end_offset) tuples, 'arrays' when they are (types, start_offsets,
+            end_offsets) tuples of parallel sequences, 'char_spans' when they
+            are lists of (e_type, start, end) tuples of character offsets, with
+            end excluded as in text[start:end]
+        :param scheme: the tagging scheme of documents given as tags, one of
+            'BIO', 'IO', 'BIOES' and 'BILOU', or 'auto' to detect it from the
+            documents: from all of them in evaluate, otherwise from the first
+            batch, or document, holding a tag other than 'O'
+        :param instrument: whether to record the time spent in each stage of
+            the evaluation and other counters, read from stats. Only available
+            with the python engine, in a single process.
+        :param worst_k: if given, the number of documents with the most errors
+            to keep track of, read from worst_documents. Only available with the
+            python engine, in a single process.
+        :param worst_schema: the schema the errors of documents are counted
+            under
+        :param worst_by: 'errors' to rank documents by their number of errors,
+            'f1' by their F1
+        :param samples: if given, the number of entities of each scenario and
+            entity type to sample, read from samples. Only available with the
+            python engine, in a single process.
+        :param seed: the seed of the sampling
+        :param confusion: whether to count the predictions of each type made
+            on true entities of each type, read from confusion_matrix. Only
+            available with the python engine, in a single process.
         """
 
-        if len(true) != len(pred):
+        # Imported here, as decoding depends on this module
+
+        from .decoding import SCHEMES
+
+        if tags is None:
+            raise TypeError("The entity types to evaluate must be given as tags")
+
+        if (true is None) != (pred is None):
+            raise ValueError("Both true and predicted documents must be given")
+
+        if true is not None and len(true) != len(pred):
             raise ValueError("Number of predicted documents does not equal true")
 
+        if engine not in ENGINES:
+            raise ValueError("Unknown engine %r, expected one of %s" % (engine, ENGINES))
+
+        if input_format not in INPUT_FORMATS:
+            raise ValueError(
+                "Unknown input format %r, expected one of %s" % (input_format, INPUT_FORMATS)
+            )
+
+        if scheme != 'auto' and scheme not in SCHEMES:
+            raise ValueError("Unknown scheme %r, expected one of %s" % (scheme, SCHEMES))
+
+        if engine == 'numpy' and input_format != 'tags':
+            raise ValueError("The numpy engine only evaluates documents given as tags")
+
+        analysis = worst_k is not None or samples is not None or confusion
+
+        if (instrument or analysis) and (engine != 'python' or n_jobs != 1):
+            raise ValueError(
+                "Instrumentation and error analysis are only available with the python "
+                "engine and n_jobs=1"
+            )
+
         self.true = true
         self.pred = pred
         self.tags = tags
+        self.engine = engine
+        self.n_jobs = os.cpu_count() if n_jobs == -1 else n_jobs
+        self.chunksize = chunksize
+        self.input_format = input_format
+        self.scheme = None
+        self.decode = None
+
+        if scheme != 'auto':
+            self._set_scheme(scheme)
+
+        # Raw counts of each scenario by entity type, from which the results
+        # are derived when they are read. See compute_results_from_counts.
+
+        self.tag_index = {e_type: i for i, e_type in enumerate(dict.fromkeys(tags))}
+        self.counts = [0] * (len(self.tag_index) * len(SCENARIOS))
+
+        # Raw counters of the instrumentation, see stats
+
+        self.instrument = instrument
+        self._stats = {
+            'documents': 0,
+            'tokens': 0,
+            'true_entities': 0,
+            'pred_entities': 0,
+            'comparisons': 0,
+            'time': {'decode': 0.0, 'match': 0.0, 'aggregate': 0.0},
+        } if instrument else None
+
+        # Error analyses, each one observing the matches of every document in
+        # turn, see analysis.py
+
+        self._observers = []
+        self._document = 0
+        self._worst = None
+        self._samples = None
+        self._confusion = None
+
+        # Imported here, as analysis depends on this module
+
+        if worst_k is not None:
+
+            from .analysis import WorstDocuments
+
+            self._worst = WorstDocuments(worst_k, worst_schema, worst_by)
+            self._observers.append(self._worst.observe)
+
+        if samples is not None:
+
+            from .analysis import ScenarioSamples
+
+            self._samples = ScenarioSamples(samples, seed)
+            self._observers.append(self._samples.observe)
+
+        if confusion:
 
-        # Setup dict into which metrics will be stored.
-
-        self.metrics_results = {
-            'correct': 0,
-            'incorrect': 0,
-            'partial': 0,
-            'missed': 0,
-            'spurious': 0,
-            'possible': 0,
-            'actual': 0,
-            'precision': 0,
-            'recall': 0,
+            from .analysis import ConfusionMatrix
+
+            self._confusion = ConfusionMatrix(self.tag_index)
+            self._observers.append(self._confusion.observe)
+
+    @property
+    def results(self):
+        """
+        The overall results, with precision and recall, of the documents
+        evaluated so far.
+        """
+
+        return self._compute_results()[0]
+
+    @property
+    def evaluation_agg_entities_type(self):
+        """
+        The results by entity type, with precision and recall, of the documents
+        evaluated so far.
+        """
+
+        return self._compute_results()[1]
+
+    @property
+    def stats(self):
+        """
+        What the evaluation so far was made of, when instrumented: the number
+        of documents, tokens and entities, the number of (pred, true) pairs
+        compared when matching entities, the number of entities in each
+        scenario, and the time spent decoding entities, matching them and
+        aggregating their counts, with the resulting throughput. None when
+        the evaluator is not instrumented.
+        """
+
+        if self._stats is None:
+            return None
+
+        stats = deepcopy(self._stats)
+
+        n_scenarios = len(SCENARIOS)
+
+        stats['scenarios'] = {
+            scenario: sum(self.counts[i::n_scenarios]) for i, scenario in enumerate(SCENARIOS)
         }
 
-        # Copy results dict to cover the four schemes.
+        seconds = sum(stats['time'].values())
+        stats['time']['total'] = seconds
 
-        self.results = {
-            'strict': deepcopy(self.metrics_results),
-            'ent_type': deepcopy(self.metrics_results),
-            'partial':deepcopy(self.metrics_results),
-            'exact':deepcopy(self.metrics_results),
-            }
+        stats['documents_per_second'] = stats['documents'] / seconds if seconds else 0.0
+        stats['tokens_per_second'] = stats['tokens'] / seconds if seconds else 0.0
 
-        # Create an accumulator to store results
+        return stats
 
-        self.evaluation_agg_entities_type = {e: deepcopy(self.results) for e in tags}
+    @property
+    def worst_documents(self):
+        """
+        The worst documents evaluated so far, worst first, each one as a dict
+        with its index in the order documents were evaluated, its metrics and
+        its scenario counts. None unless worst_k was given.
+        """
 
+        if self._worst is None:
+            return None
 
-    def evaluate(self):
+        return self._worst.results()
 
-        logging.info(
-            "Imported %s predictions for %s true examples",
-            len(self.pred), len(self.true)
+    @property
+    def samples(self):
+        """
+        A uniform sample of the entities evaluated so far in each scenario, by
+        entity type, as samples[scenario][e_type] = [(document, true, pred),
+        ...] where document is an index in the order documents were evaluated.
+        None unless samples was given.
+        """
+
+        if self._samples is None:
+            return None
+
+        return self._samples.results()
+
+    @property
+    def confusion_matrix(self):
+        """
+        The number of predictions of each type made on true entities of each
+        type so far, as confusion_matrix[true type][predicted type], where the
+        type 'none' stands for no entity: spurious predictions have the true
+        type 'none', and missed entities the predicted type 'none'. None unless
+        confusion was given.
+        """
+
+        if self._confusion is None:
+            return None
+
+        return self._confusion.results()
+
+    def _observe(self, matches):
+        """
+        Passes the matches of the next document to every error analysis.
+        """
+
+        for observe in self._observers:
+            observe(self._document, matches)
+
+        self._document += 1
+
+    def _compute_results(self):
+
+        if self._stats is None:
+            return compute_results_from_counts(self.counts, self.tag_index)
+
+        start = time.perf_counter()
+        results = compute_results_from_counts(self.counts, self.tag_index)
+        self._stats['time']['aggregate'] += time.perf_counter() - start
+
+        return results
+
+    def _set_scheme(self, scheme):
+
+        from .decoding import entity_decoder
+
+        self.scheme = scheme
+        self.decode = entity_decoder(scheme)
+
+    def _detect_scheme(self, docs):
+        """
+        Fixes the scheme from the given documents, unless it is already known.
+        Documents which only hold 'O' tags leave it unknown, to be detected
+        from the next ones.
+        """
+
+        if self.scheme is None:
+
+            from .decoding import detect_scheme
+
+            scheme = detect_scheme(docs)
+
+            if scheme is not None:
+                self._set_scheme(scheme)
+
+    def update(self, true_ents, pred_ents):
+        """
+        Adds the counts of a single document.
+
+        :param true_ents: the true tags, or spans, of the document
+        :param pred_ents: the predicted tags, or spans, of the document
+        :return: the matches found, as returned by match_named_entities
+        """
+
+        if self._stats is not None:
+            return self._update_instrumented(true_ents, pred_ents)
+
+        true_named_entities, pred_named_entities = self.decode_entities(true_ents, pred_ents)
+
+        # Only accumulate the counts of each scenario, precision and recall
+        # are calculated once, when the results are read.
+
+        matches = count_scenarios(
+            true_named_entities, pred_named_entities, self.tag_index, self.counts
         )
 
-        for true_ents, pred_ents in zip(self.true, self.pred):
+        if self._observers:
+            self._observe(matches)
+
+        return matches
+
+    def _update_instrumented(self, true_ents, pred_ents):
+        """
+        Same as update, timing each stage.
+        """
+
+        stats = self._stats
+        clock = time.perf_counter
+
+        start = clock()
+
+        true_named_entities, pred_named_entities = self.decode_entities(true_ents, pred_ents)
+
+        decoded = clock()
+
+        true_named_entities = [ent for ent in true_named_entities if ent.e_type in self.tag_index]
+        pred_named_entities = [ent for ent in pred_named_entities if ent.e_type in self.tag_index]
+
+        matches = match_named_entities(true_named_entities, pred_named_entities, stats)
+
+        matched = clock()
+
+        count_matches(matches, self.tag_index, self.counts)
+
+        if self._observers:
+            self._observe(matches)
+
+        stats['time']['aggregate'] += clock() - matched
+        stats['time']['match'] += matched - decoded
+        stats['time']['decode'] += decoded - start
+
+        stats['documents'] += 1
+        stats['true_entities'] += len(true_named_entities)
+        stats['pred_entities'] += len(pred_named_entities)
+
+        if self.input_format == 'tags':
+            stats['tokens'] += len(true_ents)
+
+        return matches
+
+    def decode_entities(self, true_ents, pred_ents):
+        """
+        :return: the true and the predicted entities of a document, as lists of
+            Entity named-tuples
+        """
+
+        if self.input_format == 'tags':
 
             # Check that the length of the true and predicted examples are the
             # same. This must be checked here, because another error may not
@@ -67,43 +407,278 @@ class Evaluator():
             if len(true_ents) != len(pred_ents):
                 raise ValueError("Prediction length does not match true example length")
 
-            # Compute results for one message
+            self._detect_scheme((true_ents, pred_ents))
+
+            # Until the scheme is known, documents only hold 'O' tags
+
+            if self.decode is None:
+                return [], []
+
+            true_named_entities = self.decode(true_ents)
+            pred_named_entities = self.decode(pred_ents)
+
+        elif self.input_format == 'spans':
+            true_named_entities = entities_from_spans(true_ents)
+            pred_named_entities = entities_from_spans(pred_ents)
 
-            tmp_results, tmp_agg_results = compute_metrics(
-                collect_named_entities(true_ents),
-                collect_named_entities(pred_ents),
-                self.tags
+        elif self.input_format == 'char_spans':
+            true_named_entities = entities_from_char_spans(true_ents)
+            pred_named_entities = entities_from_char_spans(pred_ents)
+
+        else:
+            true_named_entities = entities_from_arrays(*true_ents)
+            pred_named_entities = entities_from_arrays(*pred_ents)
+
+        return true_named_entities, pred_named_entities
+
+    def update_batch(self, true, pred):
+        """
+        Adds the counts of a batch of documents.
+
+        :param true: a list of documents, each one a list of true tags
+        :param pred: a list of documents, each one a list of predicted tags
+        """
+
+        if len(true) != len(pred):
+            raise ValueError("Number of predicted documents does not equal true")
+
+        if self.input_format == 'tags':
+            self._detect_scheme(chain(true, pred))
+
+        if self.n_jobs != 1:
+            self._update_parallel(
+                (true[i:i + self.chunksize], pred[i:i + self.chunksize])
+                for i in range(0, len(true), self.chunksize)
             )
 
-            # Cycle through each result and accumulate
+        elif self.engine == 'numpy':
+
+            # Imported here, so that numpy is only needed by this engine
+
+            from .vectorized import compute_corpus_counts
+
+            counts = compute_corpus_counts(true, pred, self.tag_index, self.scheme or 'BIO')
+
+            for i, count in enumerate(counts):
+                self.counts[i] += count
+
+        else:
+
+            for true_ents, pred_ents in zip(true, pred):
+                self.update(true_ents, pred_ents)
+
+    def _update_parallel(self, batches):
+        """
+        Counts batches of documents in a pool of worker processes, and adds
+        their counts in the order of the batches.
+
+        At most two batches per worker are in flight at a time, so batches can
+        be read lazily from a stream.
+        """
+
+        # Imported here, so that importing this module stays cheap
+
+        from concurrent.futures import ProcessPoolExecutor
+
+        pending = deque()
+
+        with ProcessPoolExecutor(max_workers=self.n_jobs) as executor:
+
+            for true, pred in batches:
+
+                if len(true) != len(pred):
+                    raise ValueError("Number of predicted documents does not equal true")
+
+                if self.input_format == 'tags':
+                    self._detect_scheme(chain(true, pred))
 
-            # TODO: Combine these loops below:
+                pending.append(
+                    executor.submit(
+                        count_documents, true, pred, list(self.tag_index),
+                        engine=self.engine, input_format=self.input_format,
+                        scheme=self.scheme or 'BIO'
+                    )
+                )
 
-            for eval_schema in self.results:
+                if len(pending) >= 2 * self.n_jobs:
+                    for i, count in enumerate(pending.popleft().result()):
+                        self.counts[i] += count
 
-                for metric in self.results[eval_schema]:
+            while pending:
+                for i, count in enumerate(pending.popleft().result()):
+                    self.counts[i] += count
 
-                    self.results[eval_schema][metric] += tmp_results[eval_schema][metric]
+    def evaluate_stream(self, documents, batch_size=None):
+        """
+        Evaluates documents as they are produced, holding at most batch_size of
+        them in memory at a time, per worker process.
+
+        :param documents: an iterable of (true tags, predicted tags) pairs, one
+            for each document
+        :param batch_size: the number of documents passed to update_batch at a
+            time, defaults to chunksize
+        :return: the overall results and the results by entity type
+        """
 
-            # Calculate global precision and recall
+        documents = iter(documents)
+        batch_size = batch_size or self.chunksize
 
-            self.results = compute_precision_recall_wrapper(self.results)
+        def batches():
+            while True:
 
-            # Aggregate results by entity type
+                batch = list(islice(documents, batch_size))
 
-            for e_type in self.tags:
+                if not batch:
+                    break
 
-                for eval_schema in tmp_agg_results[e_type]:
+                yield tuple(zip(*batch))
 
-                    for metric in tmp_agg_results[e_type][eval_schema]:
+        if self.n_jobs != 1:
+            self._update_parallel(batches())
+
+        else:
+            for true, pred in batches():
+                self.update_batch(true, pred)
 
-                        self.evaluation_agg_entities_type[e_type][eval_schema][metric] += tmp_agg_results[e_type][eval_schema][metric]
+        return self._compute_results()
 
-                # Calculate precision recall at the individual entity level
+    def evaluate(self, groups=None):
+        """
+        Evaluates the documents given as true and pred.
+
+        :param groups: optionally, the group of each document, such as its
+            source or its language, to also evaluate each group on its own in
+            the same pass. Either a sequence with the key of each document, or
+            a dict mapping names to such sequences, to break the documents down
+            in several ways at once.
+        :return: the overall results and the results by entity type. With
+            groups, also the results of each group, as results_by_group[key] =
+            (results, results by entity type), or results_by_group[name][key]
+            when groups is a dict.
+        """
 
-                self.evaluation_agg_entities_type[e_type] = compute_precision_recall_wrapper(self.evaluation_agg_entities_type[e_type])
+        if self.true is None:
+            raise ValueError("No documents to evaluate, use evaluate_stream instead")
 
-        return self.results, self.evaluation_agg_entities_type
+        logger.debug(
+            "Imported %s predictions for %s true examples",
+            len(self.pred), len(self.true)
+        )
+
+        if groups is None:
+
+            self.update_batch(self.true, self.pred)
+
+            return self._compute_results()
+
+        breakdowns = groups if isinstance(groups, dict) else {None: groups}
+
+        for keys in breakdowns.values():
+            if len(keys) != len(self.true):
+                raise ValueError("Number of group keys does not equal the number of documents")
+
+        if self.n_jobs != 1:
+            raise ValueError("Groups are only evaluated with n_jobs=1")
+
+        group_counts = self._count_groups(breakdowns)
+
+        results_by_group = {
+            name: {
+                key: compute_results_from_counts(counts, self.tag_index)
+                for key, counts in counts_by_key.items()
+            }
+            for name, counts_by_key in group_counts.items()
+        }
+
+        if not isinstance(groups, dict):
+            results_by_group = results_by_group[None]
+
+        return self._compute_results() + (results_by_group,)
+
+    def _count_groups(self, breakdowns):
+        """
+        Adds the counts of the documents given as true and pred, and counts
+        them by group too.
+
+        :param breakdowns: a dict mapping names to the group key of each
+            document
+        :return: for each name, a dict mapping each key to its flat counts, in
+            the order keys first appear
+        """
+
+        n_counts = len(self.counts)
+
+        if self.engine == 'numpy':
+
+            # Imported here, so that numpy is only needed by this engine
+
+            import numpy as np
+            from .vectorized import compute_group_counts
+
+            self._detect_scheme(chain(self.true, self.pred))
+
+            # Group keys are numbered in the order they first appear, so that
+            # the counts of each group are binned directly from the entities.
+
+            keys_by_name = {}
+            group_ids = []
+
+            for name, keys in breakdowns.items():
+
+                key_ids = keys_by_name[name] = {}
+                group_ids.append(np.fromiter(
+                    (key_ids.setdefault(key, len(key_ids)) for key in keys),
+                    dtype=np.int64, count=len(keys),
+                ))
+
+            counts, counts_by_group = compute_group_counts(
+                self.true, self.pred, self.tag_index, group_ids, self.scheme or 'BIO'
+            )
+
+            for i, count in enumerate(counts):
+                self.counts[i] += count
+
+            return {
+                name: dict(zip(key_ids, group_counts.tolist()))
+                for (name, key_ids), group_counts in zip(keys_by_name.items(), counts_by_group)
+            }
+
+        if self.input_format == 'tags':
+            self._detect_scheme(chain(self.true, self.pred))
+
+        group_counts = {name: {} for name in breakdowns}
+
+        for document, (true_ents, pred_ents) in enumerate(zip(self.true, self.pred)):
+
+            matches = self.update(true_ents, pred_ents)
+
+            for name, keys in breakdowns.items():
+                counts = group_counts[name].get(keys[document])
+                if counts is None:
+                    counts = group_counts[name][keys[document]] = [0] * n_counts
+                count_matches(matches, self.tag_index, counts)
+
+        return group_counts
+
+
+def count_documents(true, pred, tags, engine='python', input_format='tags', scheme='BIO'):
+    """
+    Counts the scenarios of a list of documents. This is the work done by each
+    worker process when evaluating in parallel.
+
+    :param true: a list of documents, each one a list of true tags
+    :param pred: a list of documents, each one a list of predicted tags
+    :param tags: the entity types to evaluate
+    :param engine: the engine used to evaluate the documents
+    :param input_format: how the documents are given, see Evaluator
+    :param scheme: the tagging scheme of the documents
+    :return: a flat list of counts, as expected by compute_results_from_counts
+    """
+
+    evaluator = Evaluator(tags=tags, engine=engine, input_format=input_format, scheme=scheme)
+    evaluator.update_batch(true, pred)
+
+    return evaluator.counts
 
 
 def collect_named_entities(tokens):
@@ -152,8 +727,77 @@ def collect_named_entities(tokens):
     return named_entities
 
 
+def entities_from_spans(spans):
+    """
+    Converts spans to a list of Entity named-tuples.
+
+    :param spans: Entity named-tuples or (e_type, start_offset, end_offset) tuples
+    :return: a list of Entity named-tuples
+    """
+
+    return [span if type(span) is Entity else Entity(*span) for span in spans]
+
+
+def entities_from_arrays(types, start_offsets, end_offsets):
+    """
+    Converts parallel sequences of entity types, start and end offsets, such as
+    the columns of a table or numpy arrays, to a list of Entity named-tuples.
+    """
+
+    if not len(types) == len(start_offsets) == len(end_offsets):
+        raise ValueError("Entity types and offsets must have the same length")
+
+    return list(map(Entity, types, start_offsets, end_offsets))
+
+
+def entities_from_char_spans(spans):
+    """
+    Converts half-open character offset spans, (e_type, start, end) with end
+    excluded, to a list of Entity named-tuples, whose end offsets are
+    inclusive. Two spans overlap, or match exactly, as character intervals if
+    and only if the resulting entities do, so they can be evaluated with the
+    same scenario logic as token offsets.
+
+    :param spans: (e_type, start, end) tuples of character offsets
+    :return: a list of Entity named-tuples
+    """
+
+    entities = [Entity(e_type, start, end - 1) for e_type, start, end in spans]
+
+    for ent in entities:
+        if ent.end_offset < ent.start_offset:
+            raise ValueError("Empty character span %r" % (ent,))
+
+    return entities
+
+
+def compute_char_metrics(true_spans, pred_spans, tags):
+    """
+    Computes the results of one untokenized document, where entities are given
+    as (e_type, start, end) tuples of half-open character offsets.
+
+    :return: the overall results and the results by entity type, as returned
+        by compute_metrics
+    """
+
+    return compute_metrics(
+        entities_from_char_spans(true_spans), entities_from_char_spans(pred_spans), tags
+    )
+
+
 def compute_metrics(true_named_entities, pred_named_entities, tags):
+    """
+    Computes the results of one document.
 
+    :param true_named_entities: the true entities, as Entity named-tuples or
+        (e_type, start_offset, end_offset) tuples
+    :param pred_named_entities: the predicted entities, in the same form
+    :param tags: the entity types to evaluate
+    :return: the overall results and the results by entity type
+    """
+
+    true_named_entities = entities_from_spans(true_named_entities)
+    pred_named_entities = entities_from_spans(pred_named_entities)
 
     eval_metrics = {'correct': 0, 'incorrect': 0, 'partial': 0, 'missed': 0, 'spurious': 0, 'precision': 0, 'recall': 0}
 
@@ -170,10 +814,6 @@ def compute_metrics(true_named_entities, pred_named_entities, tags):
 
     evaluation_agg_entities_type = {e: deepcopy(evaluation) for e in tags}
 
-    # keep track of entities that overlapped
-
-    true_which_overlapped_with_pred = []
-
     # Subset into only the tags that we are interested in.
     # NOTE: we remove the tags we don't want from both the predicted and the
     # true entities. This covers the two cases where mismatches can occur:
@@ -185,181 +825,255 @@ def compute_metrics(true_named_entities, pred_named_entities, tags):
     true_named_entities = [ent for ent in true_named_entities if ent.e_type in tags]
     pred_named_entities = [ent for ent in pred_named_entities if ent.e_type in tags]
 
-    # go through each predicted named-entity
+    for scenario, true, pred in match_named_entities(true_named_entities, pred_named_entities):
 
-    for pred in pred_named_entities:
-        found_overlap = False
+        # overall results
 
-        # Check each of the potential scenarios in turn. See
-        # http://www.davidsbatista.net/blog/2018/05/09/Named_Entity_Evaluation/
-        # for scenario explanation.
+        for eval_schema, metrics in SCENARIO_METRICS.items():
+            evaluation[eval_schema][metrics[scenario]] += 1
 
-        # Scenario I: Exact match between true and pred
+        # Scenario II: Entities are spurious (i.e., over-generated).
+        # NOTE: when pred.e_type is not found in tags
+        # or when it simply does not appear in the test set, then it is
+        # spurious, but it is not clear where to assign it at the tag
+        # level. In this case, it is applied to all target_tags
+        # found in this example. This will mean that the sum of the
+        # evaluation_agg_entities will not equal evaluation.
 
-        if pred in true_named_entities:
-            true_which_overlapped_with_pred.append(pred)
-            evaluation['strict']['correct'] += 1
-            evaluation['ent_type']['correct'] += 1
-            evaluation['exact']['correct'] += 1
-            evaluation['partial']['correct'] += 1
+        if scenario == SPURIOUS:
+            for e_type in tags:
+                for eval_schema in SCENARIO_METRICS:
+                    evaluation_agg_entities_type[e_type][eval_schema]['spurious'] += 1
 
-            # for the agg. by e_type results
-            evaluation_agg_entities_type[pred.e_type]['strict']['correct'] += 1
-            evaluation_agg_entities_type[pred.e_type]['ent_type']['correct'] += 1
-            evaluation_agg_entities_type[pred.e_type]['exact']['correct'] += 1
-            evaluation_agg_entities_type[pred.e_type]['partial']['correct'] += 1
+        # In all other scenarios we only score against the true entity, see
+        # the notes in the README.
 
         else:
+            for eval_schema, metrics in SCENARIO_METRICS.items():
+                evaluation_agg_entities_type[true.e_type][eval_schema][metrics[scenario]] += 1
+
+    # Compute 'possible', 'actual' according to SemEval-2013 Task 9.1 on the
+    # overall results, and use these to calculate precision and recall.
+
+    for eval_type in evaluation:
+        evaluation[eval_type] = compute_actual_possible(evaluation[eval_type])
 
-            # check for overlaps with any of the true entities
+    # Compute 'possible', 'actual', and precision and recall on entity level
+    # results. Start by cycling through the accumulated results.
 
-            for true in true_named_entities:
+    for entity_type, entity_level in evaluation_agg_entities_type.items():
 
-                pred_range = range(pred.start_offset, pred.end_offset)
-                true_range = range(true.start_offset, true.end_offset)
+        # Cycle through the evaluation types for each dict containing entity
+        # level results.
 
-                # Scenario IV: Offsets match, but entity type is wrong
+        for eval_type in entity_level:
 
-                if true.start_offset == pred.start_offset and pred.end_offset == true.end_offset \
-                        and true.e_type != pred.e_type:
+            evaluation_agg_entities_type[entity_type][eval_type] = compute_actual_possible(
+                entity_level[eval_type]
+            )
 
-                    # overall results
-                    evaluation['strict']['incorrect'] += 1
-                    evaluation['ent_type']['incorrect'] += 1
-                    evaluation['partial']['correct'] += 1
-                    evaluation['exact']['correct'] += 1
+    return evaluation, evaluation_agg_entities_type
 
-                    # aggregated by entity type results
-                    evaluation_agg_entities_type[true.e_type]['strict']['incorrect'] += 1
-                    evaluation_agg_entities_type[true.e_type]['ent_type']['incorrect'] += 1
-                    evaluation_agg_entities_type[true.e_type]['partial']['correct'] += 1
-                    evaluation_agg_entities_type[true.e_type]['exact']['correct'] += 1
 
-                    true_which_overlapped_with_pred.append(true)
-                    found_overlap = True
+def match_named_entities(true_named_entities, pred_named_entities, stats=None):
+    """
+    Classifies every predicted and every true entity into one of the SCENARIOS.
+
+    Both lists are sorted by offset and swept through together, keeping only
+    the true entities which can still overlap the current prediction, so that
+    a document is matched in O((P + T) log(P + T)) rather than O(P * T) when
+    entities do not overlap each other. As in a linear scan of the true
+    entities, a prediction is matched against the first true entity, in the
+    original order, with the same offsets or overlapping it.
+
+    :param true_named_entities: a list of Entity named-tuples
+    :param pred_named_entities: a list of Entity named-tuples
+    :param stats: an optional dict, whose 'comparisons' entry is increased by
+        the number of (pred, true) pairs considered, at most one per prediction
+        for exact matches
+    :return: a list of (scenario, true, pred) tuples, one for each prediction
+        followed by one for each missed true entity, where true is None for
+        spurious predictions and pred is None for missed entities
+    """
 
-                    break
+    true_order = sorted(range(len(true_named_entities)),
+                        key=lambda i: true_named_entities[i].start_offset)
 
-                # check for an overlap i.e. not exact boundary match, with true entities
+    return _match_entities(
+        true_named_entities, pred_named_entities, true_order, set(true_named_entities), stats
+    )
 
-                elif find_overlap(true_range, pred_range):
 
-                    true_which_overlapped_with_pred.append(true)
+def match_sorted_entities(true_named_entities, pred_named_entities, true_set, stats=None):
+    """
+    Same as match_named_entities, for true entities already sorted by start
+    offset, whose set is given. Both are then computed once for true entities
+    matched against many predictions, as in gold.GoldIndex.
+
+    :param true_named_entities: a list of Entity named-tuples, sorted by start
+        offset
+    :param pred_named_entities: a list of Entity named-tuples
+    :param true_set: the set of the true entities
+    :param stats: see match_named_entities
+    :return: the matches, as returned by match_named_entities
+    """
+
+    return _match_entities(
+        true_named_entities, pred_named_entities, range(len(true_named_entities)), true_set,
+        stats
+    )
 
-                    # Scenario V: There is an overlap (but offsets do not match
-                    # exactly), and the entity type is the same.
-                    # 2.1 overlaps with the same entity type
 
-                    if pred.e_type == true.e_type:
+def _match_entities(true_named_entities, pred_named_entities, true_order, true_set, stats):
+    """
+    The sweep of match_named_entities, given the indices of the true entities
+    sorted by start offset and their set.
+    """
 
-                        # overall results
-                        evaluation['strict']['incorrect'] += 1
-                        evaluation['ent_type']['correct'] += 1
-                        evaluation['partial']['partial'] += 1
-                        evaluation['exact']['incorrect'] += 1
+    true_which_overlapped_with_pred = set()
 
-                        # aggregated by entity type results
-                        evaluation_agg_entities_type[true.e_type]['strict']['incorrect'] += 1
-                        evaluation_agg_entities_type[true.e_type]['ent_type']['correct'] += 1
-                        evaluation_agg_entities_type[true.e_type]['partial']['partial'] += 1
-                        evaluation_agg_entities_type[true.e_type]['exact']['incorrect'] += 1
+    pred_order = sorted(range(len(pred_named_entities)),
+                        key=lambda i: pred_named_entities[i].start_offset)
 
-                        found_overlap = True
+    matches = [None] * len(pred_named_entities)
 
-                        break
+    # Indices of the true entities which start before the current prediction
+    # ends, and do not end before it starts.
 
-                    # Scenario VI: Entities overlap, but the entity type is
-                    # different.
+    active = []
+    next_true = 0
+    comparisons = 0
 
-                    else:
-                        # overall results
-                        evaluation['strict']['incorrect'] += 1
-                        evaluation['ent_type']['incorrect'] += 1
-                        evaluation['partial']['partial'] += 1
-                        evaluation['exact']['incorrect'] += 1
+    for i in pred_order:
+        pred = pred_named_entities[i]
 
-                        # aggregated by entity type results
-                        # Results against the true entity
+        while next_true < len(true_order) and \
+                true_named_entities[true_order[next_true]].start_offset <= pred.end_offset:
+            active.append(true_order[next_true])
+            next_true += 1
 
-                        evaluation_agg_entities_type[true.e_type]['strict']['incorrect'] += 1
-                        evaluation_agg_entities_type[true.e_type]['partial']['partial'] += 1
-                        evaluation_agg_entities_type[true.e_type]['ent_type']['incorrect'] += 1
-                        evaluation_agg_entities_type[true.e_type]['exact']['incorrect'] += 1
+        active = [j for j in active if true_named_entities[j].end_offset >= pred.start_offset]
 
-                        # Results against the predicted entity
+        # Scenario I: Exact match between true and pred
 
-                        # evaluation_agg_entities_type[pred.e_type]['strict']['spurious'] += 1
+        if pred in true_set:
+            true_which_overlapped_with_pred.add(pred)
+            matches[i] = (EXACT_MATCH, pred, pred)
+            comparisons += 1
+            continue
 
-                        found_overlap = True
+        comparisons += len(active)
 
-                        break
+        # Scenario II: Entities are spurious (i.e., over-generated), unless a
+        # true entity is found below.
 
-            # Scenario II: Entities are spurious (i.e., over-generated).
+        matches[i] = (SPURIOUS, None, pred)
 
-            if not found_overlap:
+        for j in sorted(active):
+            true = true_named_entities[j]
 
-                # Overall results
+            # Scenario IV: Offsets match, but entity type is wrong
 
-                evaluation['strict']['spurious'] += 1
-                evaluation['ent_type']['spurious'] += 1
-                evaluation['partial']['spurious'] += 1
-                evaluation['exact']['spurious'] += 1
+            if true.start_offset == pred.start_offset and pred.end_offset == true.end_offset:
+                matches[i] = (WRONG_TYPE, true, pred)
 
-                # Aggregated by entity type results
+            # check for an overlap i.e. not exact boundary match, with true
+            # entities. Scenario V: There is an overlap (but offsets do not
+            # match exactly), and the entity type is the same. Scenario VI:
+            # Entities overlap, but the entity type is different.
 
-                # NOTE: when pred.e_type is not found in tags
-                # or when it simply does not appear in the test set, then it is
-                # spurious, but it is not clear where to assign it at the tag
-                # level. In this case, it is applied to all target_tags
-                # found in this example. This will mean that the sum of the
-                # evaluation_agg_entities will not equal evaluation.
+            elif overlap(true, pred):
+                matches[i] = (OVERLAP if pred.e_type == true.e_type else OVERLAP_WRONG_TYPE, true, pred)
 
-                for true in tags:                    
+            else:
+                continue
 
-                    evaluation_agg_entities_type[true]['strict']['spurious'] += 1
-                    evaluation_agg_entities_type[true]['ent_type']['spurious'] += 1
-                    evaluation_agg_entities_type[true]['partial']['spurious'] += 1
-                    evaluation_agg_entities_type[true]['exact']['spurious'] += 1
+            true_which_overlapped_with_pred.add(true)
+            break
 
     # Scenario III: Entity was missed entirely.
 
     for true in true_named_entities:
-        if true in true_which_overlapped_with_pred:
-            continue
-        else:
-            # overall results
-            evaluation['strict']['missed'] += 1
-            evaluation['ent_type']['missed'] += 1
-            evaluation['partial']['missed'] += 1
-            evaluation['exact']['missed'] += 1
-
-            # for the agg. by e_type
-            evaluation_agg_entities_type[true.e_type]['strict']['missed'] += 1
-            evaluation_agg_entities_type[true.e_type]['ent_type']['missed'] += 1
-            evaluation_agg_entities_type[true.e_type]['partial']['missed'] += 1
-            evaluation_agg_entities_type[true.e_type]['exact']['missed'] += 1
+        if true not in true_which_overlapped_with_pred:
+            matches.append((MISSED, true, None))
 
-    # Compute 'possible', 'actual' according to SemEval-2013 Task 9.1 on the
-    # overall results, and use these to calculate precision and recall.
+    if stats is not None:
+        stats['comparisons'] += comparisons
 
-    for eval_type in evaluation:
-        evaluation[eval_type] = compute_actual_possible(evaluation[eval_type])
+    return matches
 
-    # Compute 'possible', 'actual', and precision and recall on entity level
-    # results. Start by cycling through the accumulated results.
 
-    for entity_type, entity_level in evaluation_agg_entities_type.items():
+def count_scenarios(true_named_entities, pred_named_entities, tag_index, counts):
+    """
+    Adds the scenarios of one document to a flat list of counts, laid out as
+    expected by compute_results_from_counts.
+
+    :param true_named_entities: a list of Entity named-tuples
+    :param pred_named_entities: a list of Entity named-tuples
+    :param tag_index: maps each entity type to evaluate to its row in counts
+    :param counts: the list of counts, updated in place
+    :return: the matches found, as returned by match_named_entities
+    """
 
-        # Cycle through the evaluation types for each dict containing entity
-        # level results.
+    matches = match_document(true_named_entities, pred_named_entities, tag_index)
 
-        for eval_type in entity_level:
+    count_matches(matches, tag_index, counts)
 
-            evaluation_agg_entities_type[entity_type][eval_type] = compute_actual_possible(
-                entity_level[eval_type]
-            )
+    return matches
 
-    return evaluation, evaluation_agg_entities_type
+
+def match_document(true_named_entities, pred_named_entities, tag_index):
+    """
+    Matches the entities of one document whose type is evaluated.
+
+    :param true_named_entities: a list of Entity named-tuples
+    :param pred_named_entities: a list of Entity named-tuples
+    :param tag_index: maps each entity type to evaluate to its row in counts
+    :return: the matches found, as returned by match_named_entities
+    """
+
+    # As in compute_metrics, only the tags we are interested in are matched
+
+    true_named_entities = [ent for ent in true_named_entities if ent.e_type in tag_index]
+    pred_named_entities = [ent for ent in pred_named_entities if ent.e_type in tag_index]
+
+    return match_named_entities(true_named_entities, pred_named_entities)
+
+
+def match_bins(matches, tag_index):
+    """
+    The bins of matches in a flat list of counts laid out as expected by
+    compute_results_from_counts.
+
+    :param matches: a list of (scenario, true, pred) tuples, as returned by
+        match_named_entities
+    :param tag_index: maps each entity type to evaluate to its row in counts
+    :return: a tuple with the index in the counts of each match
+    """
+
+    n_scenarios = len(SCENARIOS)
+
+    # Spurious entities are counted against the predicted type, all the other
+    # scenarios against the true type.
+
+    return tuple(
+        tag_index[pred.e_type if true is None else true.e_type] * n_scenarios + scenario
+        for scenario, true, pred in matches
+    )
+
+
+def count_matches(matches, tag_index, counts):
+    """
+    Adds matches, as returned by match_named_entities, to a flat list of counts
+    laid out as expected by compute_results_from_counts.
+
+    :param matches: a list of (scenario, true, pred) tuples
+    :param tag_index: maps each entity type to evaluate to its row in counts
+    :param counts: the list of counts, updated in place
+    """
+
+    for i in match_bins(matches, tag_index):
+        counts[i] += 1
 
 
 def find_overlap(true_range, pred_range):
@@ -368,6 +1082,9 @@ def find_overlap(true_range, pred_range):
     Find the overlap between two ranges. Return the overlapping values if
     present, else return an empty set().
 
+    NOTE: compute_metrics uses intervals.overlap instead, which does not
+    build any set and takes the end offsets of entities as inclusive.
+
     Examples:
 
     >>> find_overlap((1, 2), (2, 3))
@@ -458,3 +1175,64 @@ def compute_precision_recall_wrapper(results):
 
     return results
 
+
+def compute_results_from_counts(counts, tags):
+    """
+    Turns scenario counts into the results dicts returned by Evaluator.
+
+    :param counts: a flat sequence of len(tags) * len(SCENARIOS) integers, where
+        counts[i * len(SCENARIOS) + scenario] is the number of entities of
+        type tags[i] that fell into that scenario. Spurious entities are
+        counted against the type of the prediction.
+    :param tags: the entity types the counts refer to
+    :return: the overall results and the results by entity type
+    """
+
+    n_scenarios = len(SCENARIOS)
+    tags = list(dict.fromkeys(tags))
+    counts = [int(count) for count in counts]
+
+    if len(counts) != len(tags) * n_scenarios:
+        raise ValueError("Expected %d counts for %d tags" % (len(tags) * n_scenarios, len(tags)))
+
+    totals = [sum(counts[scenario::n_scenarios]) for scenario in range(n_scenarios)]
+
+    def to_results(scenario_counts, spurious):
+
+        results = {}
+
+        for eval_schema, metrics in SCENARIO_METRICS.items():
+
+            results[eval_schema] = {
+                'correct': 0,
+                'incorrect': 0,
+                'partial': 0,
+                'missed': 0,
+                'spurious': 0,
+                'possible': 0,
+                'actual': 0,
+                'precision': 0,
+                'recall': 0,
+            }
+
+            for scenario, metric in enumerate(metrics):
+                if scenario != SPURIOUS:
+                    results[eval_schema][metric] += scenario_counts[scenario]
+
+            # Spurious entities cannot be attributed to a true entity type, so
+            # as in compute_metrics, they are applied to all the target tags.
+
+            results[eval_schema]['spurious'] = spurious
+
+            results[eval_schema] = compute_actual_possible(results[eval_schema])
+
+        return compute_precision_recall_wrapper(results)
+
+    results = to_results(totals, totals[SPURIOUS])
+
+    evaluation_agg_entities_type = {
+        e_type: to_results(counts[i * n_scenarios:(i + 1) * n_scenarios], totals[SPURIOUS])
+        for i, e_type in enumerate(tags)
+    }
+
+    return results, evaluation_agg_entities_type
@@ -0,0 +1,143 @@
+"""
+Partial results, which can be saved on different machines and merged later.
+
+A partial result stores the raw scenario counts of the documents evaluated,
+together with the tags they refer to, as JSON (gzip compressed when the file
+name ends in .gz). Unlike the results returned by Evaluator, the counts can be
+summed, so any number of partial results can be merged into final metrics:
+
+    python -m ner_evaluation.partial node-*.json
+"""
+
+import argparse
+import gzip
+import json
+import sys
+
+from .ner_eval import SCENARIOS
+from .ner_eval import compute_results_from_counts
+
+PARTIAL_FORMAT = 'ner-evaluation-partial'
+PARTIAL_VERSION = 1
+
+
+def _open(path, mode):
+
+    if str(path).endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+
+    return open(path, mode, encoding='utf-8')
+
+
+def save_partial(path, counts, tags):
+    """
+    Saves the raw counts of an evaluation.
+
+    :param path: the file to write
+    :param counts: the scenario counts, e.g. Evaluator.counts
+    :param tags: the entity types the counts refer to, e.g. Evaluator.tag_index
+    """
+
+    tags = list(dict.fromkeys(tags))
+    n_scenarios = len(SCENARIOS)
+
+    if len(counts) != len(tags) * n_scenarios:
+        raise ValueError("Expected %d counts for %d tags" % (len(tags) * n_scenarios, len(tags)))
+
+    partial = {
+        'format': PARTIAL_FORMAT,
+        'version': PARTIAL_VERSION,
+        'scenarios': list(SCENARIOS),
+        'tags': tags,
+        'counts': [
+            [int(count) for count in counts[i * n_scenarios:(i + 1) * n_scenarios]]
+            for i in range(len(tags))
+        ],
+    }
+
+    with _open(path, 'w') as f:
+        json.dump(partial, f, separators=(',', ':'))
+
+
+def load_partial(path):
+    """
+    Loads the raw counts saved by save_partial.
+
+    :param path: the file to read
+    :return: the flat list of counts and the list of tags
+    """
+
+    with _open(path, 'r') as f:
+        partial = json.load(f)
+
+    if partial.get('format') != PARTIAL_FORMAT:
+        raise ValueError("%s is not a partial result" % path)
+
+    if partial.get('version') != PARTIAL_VERSION or partial.get('scenarios') != list(SCENARIOS):
+        raise ValueError(
+            "%s has version %s, expected %s" % (path, partial.get('version'), PARTIAL_VERSION)
+        )
+
+    counts = [count for row in partial['counts'] for count in row]
+
+    return counts, partial['tags']
+
+
+def merge_partials(paths):
+    """
+    Merges partial results, which must all refer to the same tags, although
+    not necessarily in the same order.
+
+    :param paths: the files to merge
+    :return: the flat list of merged counts and the list of tags
+    """
+
+    n_scenarios = len(SCENARIOS)
+    merged, merged_tags = None, None
+
+    for path in paths:
+
+        counts, tags = load_partial(path)
+
+        if merged is None:
+            merged, merged_tags = counts, tags
+            continue
+
+        if set(tags) != set(merged_tags):
+            raise ValueError("%s has tags %s, expected %s" % (path, tags, merged_tags))
+
+        for i, e_type in enumerate(tags):
+            row = merged_tags.index(e_type)
+            for scenario in range(n_scenarios):
+                merged[row * n_scenarios + scenario] += counts[i * n_scenarios + scenario]
+
+    if merged is None:
+        raise ValueError("No partial results to merge")
+
+    return merged, merged_tags
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(
+        prog='python -m ner_evaluation.partial',
+        description="Merge partial results and print the final metrics as JSON.",
+    )
+    parser.add_argument('partials', nargs='+', help="partial result files")
+    parser.add_argument('--save', help="also save the merged counts as a partial result")
+
+    args = parser.parse_args(argv)
+
+    counts, tags = merge_partials(args.partials)
+
+    if args.save:
+        save_partial(args.save, counts, tags)
+
+    results, results_agg = compute_results_from_counts(counts, tags)
+
+    json.dump({'results': results, 'results_agg': results_agg}, sys.stdout, indent=2)
+    sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""
+Paired significance tests between two systems evaluated on the same documents.
+
+Entities are matched once for each system, giving the scenario counts of every
+document. The permutations, or resamples, are then drawn as matrices over the
+documents and applied to those counts with matrix products.
+"""
+
+from itertools import chain
+
+import numpy as np
+
+from .decoding import resolve_scheme
+from .ner_eval import SCHEMAS
+from .vectorized import compute_document_counts
+from .vectorized import compute_scores
+
+METHODS = ('randomization', 'bootstrap')
+
+METRICS = ('precision', 'recall', 'f1')
+
+
+def significance_from_counts(counts_a, counts_b, tags, method='randomization', metric='f1',
+                             n_resamples=10000, seed=None, batch_size=100):
+    """
+    Tests whether the difference between two systems is significant, from the
+    scenario counts of every document for each system.
+
+    With method='randomization', the outputs of the two systems are swapped on
+    each document with probability 0.5 (approximate randomization). With
+    method='bootstrap', documents are resampled with replacement and the
+    differences are shifted to be centred on zero (paired bootstrap). The
+    p-values are two-sided.
+
+    :param counts_a: an array with one row of counts per document for the
+        first system, as returned by compute_document_counts
+    :param counts_b: the same, for the second system
+    :param tags: the entity types the counts refer to
+    :param method: 'randomization' or 'bootstrap'
+    :param metric: 'precision', 'recall' or 'f1'
+    :param n_resamples: the number of permutations or resamples
+    :param seed: the seed of the random number generator
+    :param batch_size: the number of permutations or resamples drawn at a time
+    :return: the overall results and the results by entity type, as
+        results[schema] = {'a': ..., 'b': ..., 'difference': ..., 'p_value': ...}
+        where difference is the score of b minus the score of a
+    """
+
+    if method not in METHODS:
+        raise ValueError("Unknown method %r, expected one of %s" % (method, METHODS))
+
+    if metric not in METRICS:
+        raise ValueError("Unknown metric %r, expected one of %s" % (metric, METRICS))
+
+    tags = list(dict.fromkeys(tags))
+    counts_a = np.asarray(counts_a)
+    counts_b = np.asarray(counts_b)
+
+    if counts_a.shape != counts_b.shape:
+        raise ValueError("Both systems must be evaluated on the same documents")
+
+    if len(counts_a) == 0:
+        raise ValueError("At least one document is needed to resample the corpus")
+
+    def score(counts):
+        return compute_scores(counts, len(tags))[METRICS.index(metric)]
+
+    n_documents = len(counts_a)
+    total_a = counts_a.sum(axis=0)
+    total_b = counts_b.sum(axis=0)
+
+    score_a = score(total_a)
+    score_b = score(total_b)
+    difference = score_b - score_a
+
+    rng = np.random.default_rng(seed)
+
+    # Compare with a small tolerance, so that floating point noise does not
+    # turn ties into differences.
+
+    threshold = np.abs(difference) - 1e-12
+    extreme = np.zeros(difference.shape, dtype=np.int64)
+
+    for start in range(0, n_resamples, batch_size):
+
+        size = min(batch_size, n_resamples - start)
+
+        if method == 'randomization':
+            swaps = rng.integers(0, 2, size=(size, n_documents))
+            delta = swaps @ (counts_b - counts_a)
+            sampled = score(total_b - delta) - score(total_a + delta)
+
+        else:
+            weights = rng.multinomial(
+                n_documents, np.full(n_documents, 1 / n_documents), size=size
+            )
+            sampled = score(weights @ counts_b) - score(weights @ counts_a) - difference
+
+        extreme += (np.abs(sampled) >= threshold).sum(axis=0)
+
+    p_values = (extreme + 1) / (n_resamples + 1)
+
+    def to_results(row):
+        return {
+            eval_schema: {
+                'a': float(score_a[row, j]),
+                'b': float(score_b[row, j]),
+                'difference': float(difference[row, j]),
+                'p_value': float(p_values[row, j]),
+            }
+            for j, eval_schema in enumerate(SCHEMAS)
+        }
+
+    results = to_results(0)
+    results_agg = {e_type: to_results(i + 1) for i, e_type in enumerate(tags)}
+
+    return results, results_agg
+
+
+def significance_test(true, pred_a, pred_b, tags, method='randomization', metric='f1',
+                      n_resamples=10000, seed=None, batch_size=100, scheme='BIO'):
+    """
+    Tests whether the difference between two systems, evaluated against the
+    same true documents, is significant under each schema, overall and by
+    entity type.
+
+    :param true: a list of documents, each one a list of true tags
+    :param pred_a: the predictions of the first system
+    :param pred_b: the predictions of the second system
+    :param tags: the entity types to evaluate
+    :param scheme: the tagging scheme of the documents, one of decoding.SCHEMES,
+        or 'auto' to detect it from the documents
+    :return: see significance_from_counts
+    """
+
+    scheme = resolve_scheme(scheme, chain(true, pred_a, pred_b))
+
+    return significance_from_counts(
+        compute_document_counts(true, pred_a, tags, scheme),
+        compute_document_counts(true, pred_b, tags, scheme),
+        tags, method, metric, n_resamples, seed, batch_size
+    )
@@ -0,0 +1,201 @@
+"""
+Seeded generator of synthetic true and predicted documents, at any scale.
+
+Each entity of a document is generated together with the prediction made for
+it, in one of the six scenarios of SCENARIOS, drawn with configurable
+proportions. Entities are always separated by at least one 'O', so that the
+scenario of each one is exactly the one the evaluator finds:
+
+    true, pred = generate_corpus(10000, length=30, density=0.1, types=4, seed=0)
+"""
+
+import random
+
+from .ner_eval import SCENARIOS
+
+# The default proportions of the scenarios, mostly exact matches
+
+DEFAULT_SCENARIOS = {
+    'exact_match': 0.6,
+    'spurious': 0.08,
+    'missed': 0.08,
+    'wrong_type': 0.08,
+    'overlap': 0.08,
+    'overlap_wrong_type': 0.08,
+}
+
+
+def encode_entity(e_type, length, scheme='BIO'):
+    """
+    :param e_type: the type of the entity
+    :param length: the number of tokens of the entity
+    :param scheme: one of decoding.SCHEMES
+    :return: the tags of the entity
+    """
+
+    if scheme == 'IO':
+        return ['I-' + e_type] * length
+
+    if scheme == 'BIO':
+        return ['B-' + e_type] + ['I-' + e_type] * (length - 1)
+
+    single, last = ('S', 'E') if scheme == 'BIOES' else ('U', 'L')
+
+    if length == 1:
+        return [single + '-' + e_type]
+
+    return ['B-' + e_type] + ['I-' + e_type] * (length - 2) + [last + '-' + e_type]
+
+
+def generate_documents(n_documents=None, length=25, density=0.2, types=4, scenarios=None,
+                       max_entity_length=3, scheme='BIO', seed=None, with_scenarios=False):
+    """
+    Generates pairs of true and predicted documents.
+
+    :param n_documents: the number of documents, None for an endless stream
+    :param length: the number of tokens of each document, or a (min, max)
+        range to draw it from
+    :param density: the probability that an entity starts on a token outside
+        any entity
+    :param types: the number of entity types, named T0, T1, ..., or their names
+    :param scenarios: a dict mapping the names in SCENARIOS to their relative
+        proportions, missing ones never occur, by default DEFAULT_SCENARIOS
+    :param max_entity_length: the maximum number of tokens of a true entity
+    :param scheme: the tagging scheme of the documents, one of decoding.SCHEMES
+    :param seed: the seed of the random number generator
+    :param with_scenarios: also yield the (scenario, entity type) of each
+        generated entity, the type being the one the evaluator counts it under
+    :return: an iterator over (true tags, predicted tags) pairs, or (true tags,
+        predicted tags, scenarios) tuples
+    """
+
+    rng = random.Random(seed)
+
+    types = ['T%d' % i for i in range(types)] if isinstance(types, int) else list(types)
+    scenarios = DEFAULT_SCENARIOS if scenarios is None else scenarios
+
+    for name in scenarios:
+        if name not in SCENARIOS:
+            raise ValueError("Unknown scenario %r, expected one of %s" % (name, SCENARIOS))
+
+    names = [name for name in SCENARIOS if scenarios.get(name, 0) > 0]
+    weights = [scenarios[name] for name in names]
+
+    if not names:
+        raise ValueError("At least one scenario must have a positive proportion")
+
+    if len(types) < 2 and {'wrong_type', 'overlap_wrong_type'} & set(names):
+        raise ValueError("Scenarios with a wrong type need at least two entity types")
+
+    min_length, max_length = (length, length) if isinstance(length, int) else length
+
+    def other_type(e_type):
+        other = rng.choice(types[:-1])
+        return types[-1] if other == e_type else other
+
+    def entity(scenario, size):
+        """
+        The true and predicted tags of a region holding one entity.
+        """
+
+        e_type = rng.choice(types)
+        outside = ['O'] * size
+
+        if scenario == 'exact_match':
+            tags = encode_entity(e_type, size, scheme)
+            return tags, tags, e_type
+
+        if scenario == 'spurious':
+            return outside, encode_entity(e_type, size, scheme), e_type
+
+        if scenario == 'missed':
+            return encode_entity(e_type, size, scheme), outside, e_type
+
+        pred_type = e_type if scenario == 'overlap' else other_type(e_type)
+
+        if scenario == 'wrong_type':
+            true = encode_entity(e_type, size, scheme)
+            return true, encode_entity(pred_type, size, scheme), e_type
+
+        # The region has one token more than the true entity. The prediction
+        # covers that token too, on either side, or one token less than the
+        # true entity when it has more than one.
+
+        shape = rng.choice(('longer_left', 'longer_right', 'shorter')[:3 if size > 2 else 2])
+
+        if shape == 'shorter':
+            true = encode_entity(e_type, size - 1, scheme) + ['O']
+            pred = encode_entity(pred_type, size - 2, scheme) + ['O', 'O']
+
+        elif shape == 'longer_left':
+            true = ['O'] + encode_entity(e_type, size - 1, scheme)
+            pred = encode_entity(pred_type, size, scheme)
+
+        else:
+            true = encode_entity(e_type, size - 1, scheme) + ['O']
+            pred = encode_entity(pred_type, size, scheme)
+
+        return true, pred, e_type
+
+    generated = 0
+
+    while n_documents is None or generated < n_documents:
+
+        n_tokens = rng.randint(min_length, max_length)
+        true, pred, document_scenarios = [], [], []
+
+        while len(true) < n_tokens:
+
+            if rng.random() >= density:
+                true.append('O')
+                pred.append('O')
+                continue
+
+            scenario = rng.choices(names, weights)[0]
+
+            # Overlaps need one token more than the true entity
+
+            size = rng.randint(1, max_entity_length)
+
+            if scenario in ('overlap', 'overlap_wrong_type'):
+                size += 1
+
+            if len(true) + size > n_tokens:
+                true.append('O')
+                pred.append('O')
+                continue
+
+            true_tags, pred_tags, e_type = entity(scenario, size)
+
+            true += true_tags
+            pred += pred_tags
+            document_scenarios.append((scenario, e_type))
+
+            # Keep entities apart, so that each one is matched on its own
+
+            if len(true) < n_tokens:
+                true.append('O')
+                pred.append('O')
+
+        generated += 1
+
+        if with_scenarios:
+            yield true, pred, document_scenarios
+        else:
+            yield true, pred
+
+
+def generate_corpus(n_documents, **kwargs):
+    """
+    Generates a corpus in memory, see generate_documents for the arguments.
+
+    :return: the list of true documents and the list of predicted documents
+    """
+
+    true, pred = [], []
+
+    for true_tags, pred_tags in generate_documents(n_documents, **kwargs):
+        true.append(true_tags)
+        pred.append(pred_tags)
+
+    return true, pred
@@ -0,0 +1,198 @@
+import pytest
+
+from ner_evaluation.analysis import ScenarioSamples
+from ner_evaluation.analysis import WorstDocuments
+from ner_evaluation.analysis import document_metrics
+from ner_evaluation.ner_eval import MISSED
+from ner_evaluation.ner_eval import SCENARIOS
+from ner_evaluation.ner_eval import Entity
+from ner_evaluation.ner_eval import Evaluator
+from ner_evaluation.synthetic import generate_corpus
+from ner_evaluation.synthetic import generate_documents
+
+TAGS = ['T0', 'T1', 'T2']
+
+
+def test_document_metrics():
+
+    # One exact match, one missed and one overlapping entity
+
+    metrics = document_metrics([1, 0, 1, 0, 1, 0], 'partial')
+
+    assert metrics['correct'] == 1
+    assert metrics['partial'] == 1
+    assert metrics['errors'] == 2
+    assert metrics['precision'] == 0.75
+    assert metrics['recall'] == 0.5
+    assert metrics['f1'] == pytest.approx(0.6)
+
+
+@pytest.mark.parametrize('by', ['errors', 'f1'])
+def test_worst_documents(by):
+
+    true, pred = generate_corpus(300, length=(1, 30), density=0.3, types=TAGS, seed=4)
+
+    evaluator = Evaluator(true, pred, tags=TAGS, worst_k=10, worst_schema='exact', worst_by=by)
+    evaluator.evaluate()
+
+    worst = evaluator.worst_documents
+
+    assert len(worst) == 10
+    assert len(evaluator._worst.heap) == 10
+
+    # The same ranking, from the results of every document evaluated on its own
+
+    def badness(document):
+        results = Evaluator(true[document:document + 1], pred[document:document + 1],
+                            tags=TAGS).evaluate()[0]['exact']
+        errors = results['incorrect'] + results['partial'] + results['missed'] + results['spurious']
+        precision, recall = results['precision'], results['recall']
+        f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0
+        return (errors,) if by == 'errors' else (1 - f1, errors)
+
+    ranked = sorted(range(len(true)), key=lambda document: (badness(document), -document),
+                    reverse=True)
+
+    assert [document['document'] for document in worst] == ranked[:10]
+    assert worst[0]['errors'] == badness(ranked[0])[-1]
+    assert sum(worst[0]['scenarios'].values()) > 0
+
+
+def test_worst_documents_skips_documents_without_errors():
+
+    true = [['B-PER', 'I-PER', 'O'], ['B-PER', 'O', 'O']]
+    pred = [['B-PER', 'I-PER', 'O'], ['O', 'O', 'B-PER']]
+
+    evaluator = Evaluator(true, pred, tags=['PER'], worst_k=5)
+    evaluator.evaluate()
+
+    worst = evaluator.worst_documents
+
+    assert [document['document'] for document in worst] == [1]
+    assert worst[0]['missed'] == worst[0]['spurious'] == 1
+    assert Evaluator(true, pred, tags=['PER']).worst_documents is None
+
+
+def test_worst_documents_errors():
+
+    with pytest.raises(ValueError):
+        WorstDocuments(0)
+
+    with pytest.raises(ValueError):
+        WorstDocuments(5, eval_schema='lenient')
+
+    with pytest.raises(ValueError):
+        WorstDocuments(5, by='recall')
+
+    with pytest.raises(ValueError):
+        Evaluator(tags=['PER'], engine='numpy', worst_k=5)
+
+    # Invalid sizes are rejected rather than turning the analyses off
+
+    with pytest.raises(ValueError):
+        Evaluator(tags=['PER'], worst_k=0)
+
+    with pytest.raises(ValueError):
+        Evaluator(tags=['PER'], samples=0)
+
+    with pytest.raises(ValueError):
+        Evaluator(tags=['PER'], engine='numpy', worst_k=0)
+
+
+def test_scenario_samples():
+
+    true, pred, scenarios = [], [], []
+
+    for true_tags, pred_tags, document_scenarios in generate_documents(
+            500, length=(1, 30), density=0.3, types=TAGS, seed=5, with_scenarios=True):
+        true.append(true_tags)
+        pred.append(pred_tags)
+        scenarios.append(document_scenarios)
+
+    evaluator = Evaluator(true, pred, tags=TAGS, samples=3, seed=0)
+    evaluator.evaluate()
+
+    samples = evaluator.samples
+
+    assert set(samples) == set(SCENARIOS)
+
+    for scenario, by_type in samples.items():
+
+        assert set(by_type) == set(TAGS)
+
+        for e_type, reservoir in by_type.items():
+
+            assert len(reservoir) == 3
+
+            for document, true_entity, pred_entity in reservoir:
+
+                # Each sample is an entity of that scenario and type, in the
+                # document it was taken from
+
+                assert (scenario, e_type) in scenarios[document]
+                assert (true_entity is None) == (scenario == 'spurious')
+                assert (pred_entity is None) == (scenario == 'missed')
+
+    # Sampling is seeded
+
+    again = Evaluator(true, pred, tags=TAGS, samples=3, seed=0)
+    again.evaluate()
+
+    assert again.samples == samples
+
+
+def test_scenario_samples_is_uniform():
+
+    # Each of four documents is kept about as often
+
+    entity = Entity('PER', 0, 0)
+    kept = []
+
+    for seed in range(2000):
+        sampler = ScenarioSamples(1, seed=seed)
+        for document in range(4):
+            sampler.observe(document, [(MISSED, entity, None)])
+        kept.append(sampler.results()['missed']['PER'][0][0])
+
+    assert all(400 < kept.count(document) < 600 for document in range(4))
+
+
+def test_confusion_matrix():
+
+    true = [
+        ['B-ORG', 'I-ORG', 'O', 'B-LOC', 'O', 'B-PER'],
+        ['B-LOC', 'O', 'B-ORG', 'I-ORG', 'I-ORG', 'O'],
+    ]
+
+    pred = [
+        ['B-LOC', 'I-LOC', 'O', 'B-LOC', 'O', 'O'],
+        ['B-LOC', 'O', 'O', 'B-LOC', 'I-LOC', 'B-PER'],
+    ]
+
+    evaluator = Evaluator(true, pred, tags=['LOC', 'ORG', 'PER'], confusion=True)
+    evaluator.evaluate()
+
+    matrix = evaluator.confusion_matrix
+
+    assert matrix['ORG'] == {'LOC': 2, 'ORG': 0, 'PER': 0, 'none': 0}
+    assert matrix['LOC'] == {'LOC': 2, 'ORG': 0, 'PER': 0, 'none': 0}
+    assert matrix['PER'] == {'LOC': 0, 'ORG': 0, 'PER': 0, 'none': 1}
+    assert matrix['none'] == {'LOC': 0, 'ORG': 0, 'PER': 1, 'none': 0}
+    assert evaluator._confusion.counts == [2, 0, 0, 0, 2, 0, 0, 0, 0, 0, 0, 1, 0, 0, 1, 0]
+
+
+def test_confusion_matrix_totals():
+
+    true, pred = generate_corpus(300, length=(1, 30), density=0.3, types=TAGS, seed=6)
+
+    evaluator = Evaluator(true, pred, tags=TAGS, confusion=True)
+    results, _ = evaluator.evaluate()
+
+    matrix = evaluator.confusion_matrix
+
+    # Every prediction, and every missed entity, is in exactly one cell
+
+    assert sum(map(sum, (row.values() for row in matrix.values()))) == \
+        results['strict']['actual'] + results['strict']['missed']
+    assert sum(row['none'] for row in matrix.values()) == results['strict']['missed']
+    assert sum(matrix['none'].values()) == results['strict']['spurious']
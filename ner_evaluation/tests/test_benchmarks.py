@@ -0,0 +1,58 @@
+import json
+
+from ner_evaluation.benchmarks import compare
+from ner_evaluation.benchmarks import main
+from ner_evaluation.benchmarks import run
+
+BASE = {'documents': 5, 'length': 10, 'density': 0.2, 'types': 2}
+
+SWEEPS = {'documents': (5, 10), 'types': (2, 3)}
+
+
+def test_run():
+
+    record = run(['collect_named_entities', 'evaluate'], SWEEPS, repeat=1, base=BASE)
+
+    # The base configuration appears in both sweeps, but is only run once
+
+    assert len(record['results']) == 2 * 3
+    assert {result['target'] for result in record['results']} == {'collect_named_entities', 'evaluate'}
+    assert all(result['seconds'] >= 0 for result in record['results'])
+
+
+def test_run_gold_cache_hit():
+
+    record = run(['gold_cache_hit'], {'documents': (5,)}, repeat=1, base=BASE)
+
+    assert [result['target'] for result in record['results']] == ['gold_cache_hit']
+
+
+def test_compare():
+
+    def record(*seconds):
+        return {'results': [
+            dict(BASE, target=target, seconds=s) for target, s in zip(('a', 'b', 'c'), seconds)
+        ]}
+
+    comparison = compare(record(1.0, 1.0, 1.0), record(1.05, 2.0, 0.5), threshold=0.1)
+
+    assert [regressed for *_, regressed in comparison] == [False, True, False]
+    assert comparison[1][3] == 2.0
+
+
+def test_main(tmp_path, capsys):
+
+    history = str(tmp_path / 'history.jsonl')
+
+    for _ in range(2):
+        assert main(['run', '--quick', '--repeat', '1', '--targets', 'collect_named_entities',
+                     '--history', history]) == 0
+
+    with open(history) as f:
+        assert len([json.loads(line) for line in f]) == 2
+
+    capsys.readouterr()
+
+    main(['compare', '--history', history, '--threshold', '1000'])
+
+    assert 'collect_named_entities' in capsys.readouterr().out
@@ -0,0 +1,94 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from ner_evaluation.bootstrap import bootstrap
+from ner_evaluation.ner_eval import Evaluator
+from ner_evaluation.vectorized import compute_document_counts
+from ner_evaluation.vectorized import compute_scores
+
+TRUE = [
+    ['O', 'B-PER', 'I-PER', 'O', 'B-LOC'],
+    ['O', 'B-LOC', 'I-LOC', 'O', 'O'],
+    ['B-ORG', 'O', 'O', 'O', 'O'],
+    ['O', 'O', 'O', 'O', 'O'],
+] * 5
+
+PRED = [
+    ['O', 'B-PER', 'I-PER', 'O', 'O'],
+    ['O', 'B-PER', 'I-PER', 'I-PER', 'O'],
+    ['B-ORG', 'I-ORG', 'O', 'O', 'B-LOC'],
+    ['O', 'O', 'O', 'O', 'O'],
+] * 5
+
+TAGS = ['PER', 'LOC', 'ORG']
+
+
+def test_compute_document_counts():
+
+    counts = compute_document_counts(TRUE, PRED, TAGS)
+
+    assert counts.shape == (len(TRUE), len(TAGS) * 6)
+
+    for i, (true_ents, pred_ents) in enumerate(zip(TRUE, PRED)):
+        evaluator = Evaluator([true_ents], [pred_ents], tags=TAGS)
+        evaluator.evaluate()
+        assert counts[i].tolist() == evaluator.counts
+
+
+def test_compute_scores_matches_evaluator():
+
+    evaluator = Evaluator(TRUE, PRED, tags=TAGS)
+    results, results_agg = evaluator.evaluate()
+
+    precision, recall, f1 = compute_scores(evaluator.counts, len(TAGS))
+
+    for j, eval_schema in enumerate(['strict', 'ent_type', 'partial', 'exact']):
+        assert precision[0, j] == pytest.approx(results[eval_schema]['precision'])
+        assert recall[0, j] == pytest.approx(results[eval_schema]['recall'])
+        for i, e_type in enumerate(TAGS):
+            assert precision[i + 1, j] == pytest.approx(results_agg[e_type][eval_schema]['precision'])
+            assert recall[i + 1, j] == pytest.approx(results_agg[e_type][eval_schema]['recall'])
+
+
+def test_bootstrap():
+
+    results, results_agg = Evaluator(TRUE, PRED, tags=TAGS).evaluate()
+
+    intervals, intervals_agg = bootstrap(TRUE, PRED, TAGS, n_resamples=200, seed=0)
+
+    for eval_schema in results:
+        for metric in ('precision', 'recall'):
+            interval = intervals[eval_schema][metric]
+            assert interval['value'] == pytest.approx(results[eval_schema][metric])
+            assert interval['low'] <= interval['value'] <= interval['high']
+
+    assert intervals_agg['ORG']['strict']['recall'] == {'value': 0.0, 'low': 0.0, 'high': 0.0}
+
+    # The same seed gives the same intervals
+
+    assert bootstrap(TRUE, PRED, TAGS, n_resamples=200, seed=0) == (intervals, intervals_agg)
+
+
+def test_bootstrap_without_documents():
+
+    with pytest.raises(ValueError, match="At least one document"):
+        bootstrap([], [], TAGS)
+
+
+def test_bootstrap_with_scheme():
+
+    true = [['S-PER', 'S-PER', 'O']] * 10
+    pred = [['S-PER', 'O', 'O']] * 10
+
+    expected = Evaluator(true, pred, tags=['PER'], scheme='BIOES').evaluate()[0]
+
+    for scheme in ('BIOES', 'auto'):
+
+        results, _ = bootstrap(true, pred, tags=['PER'], n_resamples=50, seed=0, scheme=scheme)
+
+        assert results['strict']['recall']['value'] == expected['strict']['recall'] == 0.5
+        assert results['strict']['recall']['low'] == results['strict']['recall']['high'] == 0.5
+
+    with pytest.raises(ValueError):
+        bootstrap(true, pred, tags=['PER'], scheme='BIOX')
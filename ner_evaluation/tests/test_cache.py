@@ -0,0 +1,127 @@
+import os
+
+import pytest
+
+from ner_evaluation.cache import CachedEntities
+from ner_evaluation.cache import GoldCache
+from ner_evaluation.gold import GoldIndex
+from ner_evaluation.ner_eval import collect_named_entities
+
+TRUE = [
+    ['O', 'B-PER', 'I-PER', 'O', 'B-LOC'],
+    [],
+    ['O', 'B-LOC', 'I-LOC', 'O', 'O'],
+    ['B-ORG', 'O', 'O', 'B-MISC', 'O'],
+]
+
+
+def test_gold_cache_round_trip(tmp_path):
+
+    cache = GoldCache(str(tmp_path))
+
+    expected = ([5, 0, 5, 5], [collect_named_entities(true_ents) for true_ents in TRUE])
+
+    assert cache.decode(TRUE) == expected
+    assert len(os.listdir(tmp_path)) == 1
+
+    lengths, entities = cache.load(cache.key(TRUE))
+
+    assert (lengths, list(entities)) == expected
+    assert cache.decode(TRUE)[1][-1] == expected[1][-1]
+
+
+def test_cached_entities_are_built_on_read(tmp_path):
+
+    cache = GoldCache(str(tmp_path))
+    expected = [collect_named_entities(true_ents) for true_ents in TRUE]
+
+    cache.decode(TRUE)
+    _, entities = cache.load(cache.key(TRUE))
+
+    assert isinstance(entities, CachedEntities)
+    assert len(entities) == len(TRUE)
+
+    assert entities[0] == expected[0]
+    assert entities[-1] == expected[-1]
+    assert entities[1:3] == expected[1:3]
+
+    with pytest.raises(IndexError):
+        entities[len(TRUE)]
+
+
+def test_gold_cache_key(tmp_path):
+
+    cache = GoldCache(str(tmp_path))
+
+    cache_key = cache.key(TRUE)
+
+    assert cache_key == cache.key([list(true_ents) for true_ents in TRUE])
+    assert cache_key != cache.key(TRUE, scheme='BIOES')
+    assert cache_key != cache.key(TRUE[:-1])
+
+
+def test_gold_cache_evicts_least_recently_used(tmp_path):
+
+    cache = GoldCache(str(tmp_path))
+
+    cache.store('a', [1], [[]])
+    size = os.path.getsize(cache.path('a'))
+    cache.max_bytes = 2 * size
+
+    cache.store('b', [1], [[]])
+    os.utime(cache.path('a'), (0, 0))
+    cache.store('c', [1], [[]])
+
+    assert sorted(os.listdir(tmp_path)) == ['b.gold', 'c.gold']
+
+
+def test_gold_index_with_cache(tmp_path):
+
+    cache = GoldCache(str(tmp_path))
+
+    expected = GoldIndex(TRUE, ['PER', 'LOC', 'ORG'])
+
+    for _ in range(2):
+        gold = GoldIndex(TRUE, ['PER', 'LOC', 'ORG'], cache=cache)
+        assert gold.lengths == expected.lengths
+        assert gold.entities == expected.entities
+
+
+def test_gold_cache_corrupt_files_are_misses(tmp_path):
+
+    cache = GoldCache(str(tmp_path))
+    expected = ([5, 0, 5, 5], [collect_named_entities(true_ents) for true_ents in TRUE])
+
+    cache.decode(TRUE)
+    path = cache.path(cache.key(TRUE))
+
+    with open(path, 'rb') as f:
+        valid = f.read()
+
+    header_end = valid.index(b'}') + 1
+
+    corruptions = [
+        b'',                                    # empty file
+        valid[:10],                             # truncated in the header length
+        valid[:header_end - 5],                 # truncated in the header
+        valid[:-4],                             # truncated in the data
+        valid + b'\0\0\0\0',                # data longer than the header says
+        b'NOTGOLD!' + valid[8:],                # wrong magic
+        valid[:20] + b'{' * 10 + valid[30:],    # header which is not JSON
+    ]
+
+    for corrupt in corruptions:
+
+        with open(path, 'wb') as f:
+            f.write(corrupt)
+
+        assert cache.load(cache.key(TRUE)) is None
+        assert not os.path.exists(path)
+
+        # Decoding again replaces the file
+
+        assert cache.decode(TRUE) == expected
+
+        lengths, entities = cache.load(cache.key(TRUE))
+
+        assert (lengths, list(entities)) == expected
@@ -0,0 +1,36 @@
+import json
+
+from ner_evaluation.cli import main
+
+TRUE = "Wolff B-PER\n, O\ncurrently O\n\nMadrid B-LOC\n. O\n"
+PRED = "Wolff B-PER\n, O\ncurrently B-LOC\n\nMadrid B-PER\n. O\n"
+
+
+def test_cli_json(tmp_path, capsys):
+
+    (tmp_path / 'true.conll').write_text(TRUE)
+    (tmp_path / 'pred.conll').write_text(PRED)
+
+    main([str(tmp_path / 'true.conll'), str(tmp_path / 'pred.conll'), '--tags', 'PER,LOC'])
+
+    output = json.loads(capsys.readouterr().out)
+
+    assert output['results']['strict']['correct'] == 1
+    assert output['results']['strict']['incorrect'] == 1
+    assert output['results']['strict']['spurious'] == 1
+    assert output['results_agg']['PER']['strict']['correct'] == 1
+
+
+def test_cli_tsv_single_file(tmp_path):
+
+    lines = [t.split() + p.split()[1:] for t, p in zip(TRUE.splitlines(), PRED.splitlines())]
+    (tmp_path / 'test.conll').write_text('\n'.join(' '.join(line) for line in lines) + '\n')
+
+    main([str(tmp_path / 'test.conll'), '--tags', 'PER,LOC', '--format', 'tsv',
+          '--output', str(tmp_path / 'metrics.tsv')])
+
+    rows = [line.split('\t') for line in (tmp_path / 'metrics.tsv').read_text().splitlines()]
+
+    assert rows[0][:3] == ['entity_type', 'schema', 'correct']
+    assert rows[1][:3] == ['ALL', 'strict', '1']
+    assert len(rows) == 1 + 3 * 4
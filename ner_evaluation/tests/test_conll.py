@@ -0,0 +1,109 @@
+import gzip
+import threading
+import time
+
+import pytest
+
+from ner_evaluation.conll import read_conll
+from ner_evaluation.conll import read_conll_pair
+from ner_evaluation.ner_eval import Evaluator
+
+CONLL = """-DOCSTART- O O
+
+Wolff B-PER B-PER
+, O O
+currently O B-LOC
+
+Madrid B-LOC B-LOC
+. O O
+
+
+Ruiz B-PER O
+"""
+
+
+def test_read_conll(tmp_path):
+
+    path = tmp_path / 'test.conll'
+    path.write_text(CONLL)
+
+    assert list(read_conll(path)) == [
+        (['B-PER', 'O', 'O'], ['B-PER', 'O', 'B-LOC']),
+        (['B-LOC', 'O'], ['B-LOC', 'O']),
+        (['B-PER'], ['O']),
+    ]
+
+
+def test_read_conll_gzip_with_prefetch(tmp_path):
+
+    path = tmp_path / 'test.conll.gz'
+
+    with gzip.open(path, 'wt') as f:
+        f.write(CONLL)
+
+    assert list(read_conll(path, columns=(1,), prefetch=2)) == [
+        (['B-PER', 'O', 'O'],),
+        (['B-LOC', 'O'],),
+        (['B-PER'],),
+    ]
+
+
+def test_read_conll_pair(tmp_path):
+
+    (tmp_path / 'true.conll').write_text("Wolff B-PER\n, O\n\nMadrid B-LOC\n")
+    (tmp_path / 'pred.conll').write_text("Wolff B-PER\n, O\n\nMadrid B-PER\n")
+
+    documents = read_conll_pair(tmp_path / 'true.conll', tmp_path / 'pred.conll')
+
+    evaluator = Evaluator(tags=['PER', 'LOC'])
+    results, results_agg = evaluator.evaluate_stream(documents)
+
+    assert results['strict']['correct'] == 1
+    assert results['strict']['incorrect'] == 1
+
+    (tmp_path / 'pred.conll').write_text("Wolff B-PER\n, O\n")
+
+    with pytest.raises(ValueError):
+        list(read_conll_pair(tmp_path / 'true.conll', tmp_path / 'pred.conll'))
+
+
+def _prefetch_threads():
+    return [thread for thread in threading.enumerate() if thread.name == 'ner-evaluation-prefetch']
+
+
+def _wait_for_prefetch_threads():
+    for _ in range(100):
+        if not _prefetch_threads():
+            return
+        time.sleep(0.05)
+
+
+def test_prefetch_stops_when_abandoned(tmp_path):
+
+    path = tmp_path / 'many.conll'
+    path.write_text('\n\n'.join('a O B-PER' for _ in range(1000)) + '\n', encoding='utf-8')
+
+    documents = read_conll(path, prefetch=2)
+
+    assert next(documents) == (['O'], ['B-PER'])
+    assert len(_prefetch_threads()) == 1
+
+    documents.close()
+    _wait_for_prefetch_threads()
+
+    assert _prefetch_threads() == []
+
+
+def test_prefetch_stops_on_document_count_mismatch(tmp_path):
+
+    true_path = tmp_path / 'true.conll'
+    pred_path = tmp_path / 'pred.conll'
+    true_path.write_text('\n\n'.join('a B-PER' for _ in range(1000)) + '\n', encoding='utf-8')
+    pred_path.write_text('a B-PER\n', encoding='utf-8')
+
+    with pytest.raises(ValueError):
+        list(read_conll_pair(true_path, pred_path, prefetch=2))
+
+    _wait_for_prefetch_threads()
+
+    assert _prefetch_threads() == []
@@ -0,0 +1,146 @@
+import random
+
+import pytest
+
+from ner_evaluation.decoding import TagDecoder
+from ner_evaluation.decoding import detect_scheme
+from ner_evaluation.ner_eval import Entity
+from ner_evaluation.ner_eval import Evaluator
+from ner_evaluation.ner_eval import collect_named_entities
+from ner_evaluation.window import WindowedEvaluator
+
+
+def test_bio_decoder_matches_collect_named_entities():
+
+    rng = random.Random(0)
+
+    labels = ['O', 'B-PER', 'I-PER', 'B-LOC', 'I-LOC', 'I-ORG', 'E-PER', 'S-LOC']
+    decoder = TagDecoder('BIO')
+
+    for _ in range(2000):
+        tokens = [rng.choice(labels) for _ in range(rng.randint(0, 12))]
+        assert decoder.decode(tokens) == collect_named_entities(tokens)
+
+
+def test_bioes_decoder():
+
+    tokens = ['S-PER', 'B-LOC', 'I-LOC', 'E-LOC', 'S-LOC', 'B-PER', 'E-LOC', 'I-PER', 'O']
+
+    assert TagDecoder('BIOES').decode(tokens) == [
+        Entity('PER', 0, 0),
+        Entity('LOC', 1, 3),
+        Entity('LOC', 4, 4),
+        Entity('PER', 5, 5),
+        Entity('LOC', 6, 6),
+        Entity('PER', 7, 7),
+    ]
+
+
+def test_bilou_decoder():
+
+    tokens = ['U-PER', 'U-PER', 'B-LOC', 'L-LOC', 'B-ORG', 'I-ORG']
+
+    assert TagDecoder('BILOU').decode(tokens) == [
+        Entity('PER', 0, 0),
+        Entity('PER', 1, 1),
+        Entity('LOC', 2, 3),
+        Entity('ORG', 4, 5),
+    ]
+
+
+def test_io_decoder():
+
+    tokens = ['I-PER', 'I-PER', 'I-LOC', 'O', 'I-LOC']
+
+    assert TagDecoder('IO').decode(tokens) == [
+        Entity('PER', 0, 1),
+        Entity('LOC', 2, 2),
+        Entity('LOC', 4, 4),
+    ]
+
+
+def test_unknown_scheme():
+
+    with pytest.raises(ValueError):
+        TagDecoder('BIOX')
+
+    with pytest.raises(ValueError):
+        Evaluator(tags=['PER'], scheme='BIOX')
+
+
+def test_detect_scheme():
+
+    assert detect_scheme([['O', 'B-PER', 'I-PER']]) == 'BIO'
+    assert detect_scheme([['O', 'I-PER'], ['I-LOC']]) == 'IO'
+    assert detect_scheme([['B-PER', 'E-PER'], ['S-LOC']]) == 'BIOES'
+    assert detect_scheme([['B-PER', 'L-PER'], ['U-LOC']]) == 'BILOU'
+    assert detect_scheme([['O', 'O']]) is None
+    assert detect_scheme([]) is None
+
+
+def test_evaluator_with_scheme():
+
+    true = [['S-PER', 'S-PER', 'O', 'B-LOC', 'E-LOC']]
+    pred = [['B-PER', 'E-PER', 'O', 'B-LOC', 'E-LOC']]
+
+    evaluator = Evaluator(true, pred, tags=['PER', 'LOC'], scheme='BIOES')
+    results, results_agg = evaluator.evaluate()
+
+    assert results_agg['LOC']['strict']['correct'] == 1
+    assert results_agg['PER']['strict']['correct'] == 0
+    assert results_agg['PER']['partial']['partial'] == 1
+    assert results_agg['PER']['partial']['missed'] == 1
+
+    detected = Evaluator(true, pred, tags=['PER', 'LOC'], scheme='auto')
+
+    assert detected.evaluate() == (results, results_agg)
+    assert detected.scheme == 'BIOES'
+
+
+def test_auto_scheme_skips_documents_without_entities():
+
+    evaluator = Evaluator(tags=['PER', 'X'], scheme='auto')
+
+    evaluator.update(['O', 'O'], ['O', 'O'])
+
+    assert evaluator.scheme is None
+
+    evaluator.update(['S-PER', 'S-PER'], ['S-PER', 'S-PER'])
+    evaluator.update(['E-X', 'S-X'], ['E-X', 'S-X'])
+
+    assert evaluator.scheme == 'BIOES'
+    assert evaluator.results['strict']['correct'] == 4
+    assert evaluator.results['strict']['possible'] == 4
+
+    window = WindowedEvaluator(tags=['PER'], size=10, scheme='auto')
+
+    window.update(['O', 'O', 'O'], ['O', 'O', 'O'])
+    window.update(['S-PER', 'S-PER', 'O'], ['S-PER', 'O', 'O'])
+
+    assert window.evaluator.scheme == 'BIOES'
+    assert window.results['strict']['recall'] == 0.5
+
+
+def test_numpy_engine_with_scheme():
+
+    pytest.importorskip("numpy")
+
+    rng = random.Random(1)
+
+    labels = ['O', 'O', 'O'] + [
+        prefix + '-' + e_type for prefix in 'BIESLU' for e_type in ('PER', 'LOC', 'MISC')
+    ]
+
+    for scheme in ('IO', 'BIOES', 'BILOU'):
+
+        true, pred = [], []
+
+        for _ in range(200):
+            length = rng.randint(0, 12)
+            true.append([rng.choice(labels) for _ in range(length)])
+            pred.append([rng.choice(labels) for _ in range(length)])
+
+        python = Evaluator(true, pred, tags=['PER', 'LOC'], scheme=scheme)
+        numpy = Evaluator(true, pred, tags=['PER', 'LOC'], scheme=scheme, engine='numpy')
+
+        assert python.evaluate() == numpy.evaluate()
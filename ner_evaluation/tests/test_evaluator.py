@@ -1,6 +1,8 @@
 import pytest
 
+from ner_evaluation.ner_eval import Entity
 from ner_evaluation.ner_eval import Evaluator
+from ner_evaluation.synthetic import generate_corpus
 
 
 def test_evaluator_simple_case():
@@ -619,3 +621,248 @@ def test_evaluator_non_matching_corpus_length():
     with pytest.raises(ValueError):
         evaluator = Evaluator(true, pred, tags=['PER', 'MISC'])
 
+
+
+def test_evaluator_accumulates_raw_counts():
+
+    true = [
+        ['O', 'B-PER', 'I-PER', 'O', 'B-LOC'],
+        ['O', 'B-LOC', 'I-LOC', 'O', 'O'],
+    ]
+
+    pred = [
+        ['O', 'B-PER', 'I-PER', 'O', 'O'],
+        ['O', 'B-PER', 'I-PER', 'I-PER', 'O'],
+    ]
+
+    evaluator = Evaluator(true, pred, tags=['PER', 'LOC'])
+
+    results, results_agg = evaluator.evaluate()
+
+    # One row per tag, one column per scenario
+
+    assert evaluator.counts == [
+        1, 0, 0, 0, 0, 0,
+        0, 0, 1, 0, 0, 1,
+    ]
+
+    assert results == evaluator.results
+    assert results_agg == evaluator.evaluation_agg_entities_type
+    assert results['strict']['precision'] == 0.5
+    assert results['strict']['recall'] == 1 / 3
+    assert results['partial']['recall'] == 0.5
+
+
+def test_evaluator_stream_matches_evaluate():
+
+    true = [
+        ['O', 'B-PER', 'I-PER', 'O', 'B-LOC'],
+        ['O', 'B-LOC', 'I-LOC', 'O', 'O'],
+        ['B-ORG', 'O', 'O', 'O', 'O'],
+    ]
+
+    pred = [
+        ['O', 'B-PER', 'I-PER', 'O', 'O'],
+        ['O', 'B-PER', 'I-PER', 'I-PER', 'O'],
+        ['B-ORG', 'I-ORG', 'O', 'O', 'B-LOC'],
+    ]
+
+    tags = ['PER', 'LOC', 'ORG']
+
+    expected = Evaluator(true, pred, tags=tags).evaluate()
+
+    documents = ((true_ents, pred_ents) for true_ents, pred_ents in zip(true, pred))
+
+    evaluator = Evaluator(tags=tags)
+
+    assert evaluator.evaluate_stream(documents, batch_size=2) == expected
+
+    evaluator = Evaluator(tags=tags)
+
+    for true_ents, pred_ents in zip(true, pred):
+        evaluator.update(true_ents, pred_ents)
+
+    assert (evaluator.results, evaluator.evaluation_agg_entities_type) == expected
+
+
+def test_evaluator_update_wrong_prediction_length():
+
+    evaluator = Evaluator(tags=['ORG'])
+
+    with pytest.raises(ValueError):
+        evaluator.update(['O', 'B-ORG', 'I-ORG', 'O', 'O'], ['O', 'B-ORG', 'I-ORG', 'O'])
+
+
+def test_evaluator_parallel_matches_serial():
+
+    true = [
+        ['O', 'B-PER', 'I-PER', 'O', 'B-LOC'],
+        ['O', 'B-LOC', 'I-LOC', 'O', 'O'],
+        ['B-ORG', 'O', 'O', 'O', 'O'],
+    ] * 5
+
+    pred = [
+        ['O', 'B-PER', 'I-PER', 'O', 'O'],
+        ['O', 'B-PER', 'I-PER', 'I-PER', 'O'],
+        ['B-ORG', 'I-ORG', 'O', 'O', 'B-LOC'],
+    ] * 5
+
+    tags = ['PER', 'LOC', 'ORG']
+
+    expected = Evaluator(true, pred, tags=tags).evaluate()
+
+    evaluator = Evaluator(true, pred, tags=tags, n_jobs=2, chunksize=4)
+
+    assert evaluator.evaluate() == expected
+
+    evaluator = Evaluator(tags=tags, n_jobs=2, chunksize=4)
+
+    assert evaluator.evaluate_stream(zip(true, pred)) == expected
+
+
+def test_evaluator_spans_input():
+
+    true = [
+        ['O', 'B-PER', 'I-PER', 'O', 'B-LOC'],
+        ['O', 'B-LOC', 'I-LOC', 'O', 'O'],
+    ]
+
+    pred = [
+        ['O', 'B-PER', 'I-PER', 'O', 'O'],
+        ['O', 'B-PER', 'I-PER', 'I-PER', 'O'],
+    ]
+
+    expected = Evaluator(true, pred, tags=['PER', 'LOC']).evaluate()
+
+    true_spans = [
+        [Entity('PER', 1, 2), Entity('LOC', 4, 4)],
+        [('LOC', 1, 2)],
+    ]
+
+    pred_spans = [
+        [('PER', 1, 2)],
+        [('PER', 1, 3)],
+    ]
+
+    evaluator = Evaluator(true_spans, pred_spans, tags=['PER', 'LOC'], input_format='spans')
+
+    assert evaluator.evaluate() == expected
+
+    true_arrays = [(['PER', 'LOC'], [1, 4], [2, 4]), (['LOC'], [1], [2])]
+    pred_arrays = [(['PER'], [1], [2]), (['PER'], [1], [3])]
+
+    evaluator = Evaluator(true_arrays, pred_arrays, tags=['PER', 'LOC'], input_format='arrays')
+
+    assert evaluator.evaluate() == expected
+
+
+def test_evaluator_spans_input_not_supported_by_numpy_engine():
+
+    with pytest.raises(ValueError):
+        Evaluator([], [], tags=['PER'], engine='numpy', input_format='spans')
+
+
+def test_evaluator_char_spans_input():
+
+    true = [[('PER', 0, 12), ('LOC', 21, 34)], [('ORG', 0, 6)]]
+    pred = [[('PER', 0, 12), ('LOC', 25, 29)], [('ORG', 6, 10)]]
+
+    evaluator = Evaluator(true, pred, tags=['PER', 'LOC', 'ORG'], input_format='char_spans')
+
+    results, results_agg = evaluator.evaluate()
+
+    assert results['strict']['correct'] == 1
+    assert results['partial']['partial'] == 1
+    assert results_agg['ORG']['strict']['missed'] == 1
+    assert results_agg['ORG']['strict']['spurious'] == 1
+
+
+def test_evaluator_instrumentation():
+
+    true = [
+        ['O', 'B-PER', 'I-PER', 'O', 'B-LOC'],
+        ['O', 'B-LOC', 'I-LOC', 'O', 'O', 'O'],
+    ]
+
+    pred = [
+        ['O', 'B-PER', 'I-PER', 'O', 'O'],
+        ['O', 'B-LOC', 'I-LOC', 'I-LOC', 'O', 'B-PER'],
+    ]
+
+    assert Evaluator(true, pred, tags=['PER', 'LOC']).stats is None
+
+    evaluator = Evaluator(true, pred, tags=['PER', 'LOC'], instrument=True)
+    results = evaluator.evaluate()
+
+    stats = evaluator.stats
+
+    assert stats['documents'] == 2
+    assert stats['tokens'] == 11
+    assert stats['true_entities'] == 3
+    assert stats['pred_entities'] == 3
+    assert stats['comparisons'] == 2
+    assert stats['scenarios'] == {
+        'exact_match': 1, 'spurious': 1, 'missed': 1,
+        'wrong_type': 0, 'overlap': 1, 'overlap_wrong_type': 0,
+    }
+    assert set(stats['time']) == {'decode', 'match', 'aggregate', 'total'}
+    assert stats['time']['total'] > 0
+    assert stats['documents_per_second'] > 0
+
+    # The results are the same as without instrumentation
+
+    assert results == Evaluator(true, pred, tags=['PER', 'LOC']).evaluate()
+
+
+def test_evaluator_instrumentation_not_supported_in_parallel():
+
+    with pytest.raises(ValueError):
+        Evaluator(tags=['PER'], n_jobs=2, instrument=True)
+
+    with pytest.raises(ValueError):
+        Evaluator(tags=['PER'], engine='numpy', instrument=True)
+
+
+def test_evaluator_groups():
+
+    true, pred = generate_corpus(200, length=(1, 30), density=0.3, types=['PER', 'LOC'], seed=8)
+
+    sources = ['news' if i % 3 else 'web' for i in range(len(true))]
+    languages = ['en' if i % 2 else 'de' for i in range(len(true))]
+
+    evaluator = Evaluator(true, pred, tags=['PER', 'LOC'])
+    results, results_agg, results_by_group = evaluator.evaluate(groups=sources)
+
+    assert (results, results_agg) == Evaluator(true, pred, tags=['PER', 'LOC']).evaluate()
+    assert list(results_by_group) == ['web', 'news']
+
+    for source, group_results in results_by_group.items():
+        documents = [i for i, key in enumerate(sources) if key == source]
+        expected = Evaluator([true[i] for i in documents], [pred[i] for i in documents],
+                             tags=['PER', 'LOC']).evaluate()
+        assert group_results == expected
+
+    # Several breakdowns in the same pass, with both engines
+
+    evaluator = Evaluator(true, pred, tags=['PER', 'LOC'])
+    breakdowns = evaluator.evaluate(groups={'source': sources, 'language': languages})
+
+    assert breakdowns[2]['source'] == results_by_group
+    assert set(breakdowns[2]['language']) == {'de', 'en'}
+
+    pytest.importorskip("numpy")
+
+    numpy = Evaluator(true, pred, tags=['PER', 'LOC'], engine='numpy')
+
+    assert numpy.evaluate(groups={'source': sources, 'language': languages}) == breakdowns
+
+
+def test_evaluator_groups_errors():
+
+    true = [['B-PER', 'O'], ['O', 'B-PER']]
+
+    with pytest.raises(ValueError):
+        Evaluator(true, true, tags=['PER']).evaluate(groups=['a'])
+
+    with pytest.raises(ValueError):
+        Evaluator(true, true, tags=['PER'], n_jobs=2).evaluate(groups=['a', 'b'])
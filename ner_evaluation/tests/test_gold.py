@@ -0,0 +1,91 @@
+import os
+
+import pytest
+
+from ner_evaluation.cache import GoldCache
+from ner_evaluation.gold import GoldIndex
+from ner_evaluation.gold import evaluate_systems
+from ner_evaluation.ner_eval import Evaluator
+
+TRUE = [
+    ['O', 'B-PER', 'I-PER', 'O', 'B-LOC'],
+    ['O', 'B-LOC', 'I-LOC', 'O', 'O'],
+    ['B-ORG', 'O', 'O', 'B-MISC', 'O'],
+]
+
+SYSTEMS = {
+    'exact': TRUE,
+    'errors': [
+        ['O', 'B-PER', 'I-PER', 'O', 'O'],
+        ['O', 'B-PER', 'I-PER', 'I-PER', 'O'],
+        ['B-ORG', 'I-ORG', 'O', 'O', 'B-LOC'],
+    ],
+}
+
+TAGS = ['PER', 'LOC', 'ORG']
+
+
+@pytest.mark.parametrize('n_jobs', [1, 2])
+def test_evaluate_systems(n_jobs):
+
+    gold = GoldIndex(TRUE, TAGS)
+
+    results = evaluate_systems(gold, SYSTEMS, n_jobs=n_jobs)
+
+    assert list(results) == ['exact', 'errors']
+
+    for name, pred in SYSTEMS.items():
+        assert results[name] == Evaluator(TRUE, pred, tags=TAGS).evaluate()
+
+
+def test_gold_index_is_filtered():
+
+    gold = GoldIndex(TRUE, TAGS)
+
+    assert len(gold) == 3
+    assert [ent.e_type for ent in gold.entities[2]] == ['ORG']
+    assert gold.entity_sets == [set(true_named_entities) for true_named_entities in gold.entities]
+
+
+def test_gold_index_wrong_prediction_length():
+
+    gold = GoldIndex(TRUE, TAGS)
+
+    with pytest.raises(ValueError):
+        gold.count(TRUE[:2])
+
+    with pytest.raises(ValueError):
+        gold.count([doc[:-1] for doc in TRUE])
+
+
+def test_evaluate_systems_with_scheme(tmp_path):
+
+    true = [
+        ['S-PER', 'O', 'B-LOC', 'E-LOC'],
+        ['O', 'O', 'O', 'O'],
+        ['B-ORG', 'I-ORG', 'E-ORG', 'S-PER'],
+    ]
+
+    systems = {
+        'exact': true,
+        'errors': [
+            ['B-PER', 'E-PER', 'B-LOC', 'E-LOC'],
+            ['O', 'S-LOC', 'O', 'O'],
+            ['S-ORG', 'S-ORG', 'O', 'S-PER'],
+        ],
+    }
+
+    for scheme in ('BIOES', 'auto'):
+
+        gold = GoldIndex(true, TAGS, cache=GoldCache(str(tmp_path)), scheme=scheme)
+
+        assert gold.scheme == 'BIOES'
+
+        results = evaluate_systems(gold, systems)
+
+        for name, pred in systems.items():
+            assert results[name] == Evaluator(true, pred, tags=TAGS, scheme='BIOES').evaluate()
+
+    # Both indexes were decoded under the same key
+
+    assert len(os.listdir(tmp_path)) == 1
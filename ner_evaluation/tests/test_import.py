@@ -0,0 +1,37 @@
+import json
+import logging
+import subprocess
+import sys
+
+# Generous enough for slow CI machines, about ten times the usual import time
+
+IMPORT_BUDGET = 0.25
+
+SCRIPT = """
+import json, logging, sys, time
+
+start = time.perf_counter()
+import ner_evaluation.ner_eval
+elapsed = time.perf_counter() - start
+
+print(json.dumps({
+    'elapsed': elapsed,
+    'modules': [name for name in ('numpy', 'concurrent.futures') if name in sys.modules],
+    'handlers': len(logging.getLogger().handlers),
+    'level': logging.getLogger().level,
+}))
+"""
+
+
+def test_import_is_cheap_and_side_effect_free():
+
+    output = subprocess.run(
+        [sys.executable, '-c', SCRIPT], check=True, capture_output=True, text=True
+    ).stdout
+
+    result = json.loads(output)
+
+    assert result['elapsed'] < IMPORT_BUDGET
+    assert result['modules'] == []
+    assert result['handlers'] == 0
+    assert result['level'] == logging.WARNING
@@ -0,0 +1,52 @@
+import doctest
+
+from ner_evaluation import intervals
+from ner_evaluation.ner_eval import Entity
+from ner_evaluation.intervals import contains
+from ner_evaluation.intervals import intersection_length
+from ner_evaluation.intervals import iou
+from ner_evaluation.intervals import overlap
+from ner_evaluation.intervals import span_length
+
+
+def test_overlap_single_token_spans():
+
+    assert overlap(Entity('PER', 3, 3), Entity('PER', 3, 3))
+    assert overlap(Entity('PER', 3, 3), Entity('LOC', 1, 5))
+    assert not overlap(Entity('PER', 3, 3), Entity('PER', 4, 4))
+
+
+def test_overlap_touching_spans():
+
+    assert overlap(Entity('PER', 1, 2), Entity('PER', 2, 3))
+    assert not overlap(Entity('PER', 1, 2), Entity('PER', 3, 4))
+
+
+def test_intersection_length():
+
+    assert intersection_length(Entity('PER', 1, 5), Entity('LOC', 4, 9)) == 2
+    assert intersection_length(Entity('PER', 1, 5), Entity('LOC', 6, 9)) == 0
+    assert intersection_length(Entity('PER', 1, 5), Entity('LOC', 2, 2)) == 1
+
+
+def test_iou():
+
+    assert iou(Entity('PER', 1, 5), Entity('LOC', 1, 5)) == 1.0
+    assert iou(Entity('PER', 1, 5), Entity('LOC', 6, 9)) == 0
+    assert iou(Entity('PER', 0, 1), Entity('LOC', 1, 2)) == 1 / 3
+
+
+def test_contains():
+
+    assert contains(Entity('PER', 1, 5), Entity('PER', 2, 3))
+    assert contains(Entity('PER', 1, 5), Entity('PER', 1, 5))
+    assert not contains(Entity('PER', 2, 3), Entity('PER', 1, 5))
+    assert span_length(Entity('PER', 3, 3)) == 1
+
+
+def test_docstring_examples():
+
+    failures, tests = doctest.testmod(intervals)
+
+    assert tests > 0
+    assert failures == 0
@@ -1,3 +1,5 @@
+import pytest
+
 from ner_evaluation.ner_eval import Entity
 from ner_evaluation.ner_eval import compute_metrics
 from ner_evaluation.ner_eval import collect_named_entities
@@ -5,6 +7,13 @@ from ner_evaluation.ner_eval import find_overlap
 from ner_evaluation.ner_eval import compute_actual_possible
 from ner_evaluation.ner_eval import compute_precision_recall
 from ner_evaluation.ner_eval import compute_precision_recall_wrapper
+from ner_evaluation.ner_eval import match_bins
+from ner_evaluation.ner_eval import match_document
+from ner_evaluation.ner_eval import match_named_entities
+from ner_evaluation.ner_eval import match_sorted_entities
+from ner_evaluation.ner_eval import entities_from_arrays
+from ner_evaluation.ner_eval import compute_char_metrics
+from ner_evaluation.ner_eval import EXACT_MATCH, SPURIOUS, MISSED, WRONG_TYPE, OVERLAP, OVERLAP_WRONG_TYPE
 
 
 def test_collect_named_entities_same_type_in_sequence():
@@ -914,3 +923,157 @@ def test_compute_precision_recall():
 
     assert out == expected
 
+
+
+def test_match_named_entities_scenarios():
+
+    true_named_entities = [
+        Entity('PER', 59, 69),
+        Entity('LOC', 127, 134),
+        Entity('LOC', 164, 174),
+        Entity('MISC', 230, 240)
+    ]
+
+    pred_named_entities = [
+        Entity('LOC', 225, 243),
+        Entity('PER', 24, 30),
+        Entity('LOC', 124, 134),
+        Entity('PER', 164, 174),
+        Entity('PER', 59, 69),
+    ]
+
+    matches = match_named_entities(true_named_entities, pred_named_entities)
+
+    assert matches == [
+        (OVERLAP_WRONG_TYPE, Entity('MISC', 230, 240), Entity('LOC', 225, 243)),
+        (SPURIOUS, None, Entity('PER', 24, 30)),
+        (OVERLAP, Entity('LOC', 127, 134), Entity('LOC', 124, 134)),
+        (WRONG_TYPE, Entity('LOC', 164, 174), Entity('PER', 164, 174)),
+        (EXACT_MATCH, Entity('PER', 59, 69), Entity('PER', 59, 69)),
+    ]
+
+
+def test_match_named_entities_first_match_wins():
+
+    # The prediction overlaps both true entities, it is only matched against
+    # the first one, so the second one is missed.
+
+    true_named_entities = [Entity('LOC', 20, 25), Entity('PER', 10, 15)]
+    pred_named_entities = [Entity('PER', 12, 24)]
+
+    matches = match_named_entities(true_named_entities, pred_named_entities)
+
+    assert matches == [
+        (OVERLAP_WRONG_TYPE, Entity('LOC', 20, 25), Entity('PER', 12, 24)),
+        (MISSED, Entity('PER', 10, 15), None),
+    ]
+
+
+def test_match_sorted_entities():
+
+    true_named_entities = [
+        Entity('PER', 59, 69),
+        Entity('LOC', 127, 134),
+        Entity('LOC', 164, 174),
+        Entity('MISC', 230, 240)
+    ]
+
+    pred_named_entities = [
+        Entity('LOC', 225, 243),
+        Entity('PER', 24, 30),
+        Entity('LOC', 124, 134),
+        Entity('PER', 164, 174),
+        Entity('PER', 59, 69),
+        Entity('PER', 60, 61),
+    ]
+
+    matches = match_sorted_entities(
+        true_named_entities, pred_named_entities, set(true_named_entities)
+    )
+
+    assert matches == match_named_entities(true_named_entities, pred_named_entities)
+
+
+def test_match_bins():
+
+    true_named_entities = [Entity('PER', 0, 1), Entity('LOC', 3, 3), Entity('MISC', 5, 5)]
+    pred_named_entities = [Entity('LOC', 0, 1), Entity('PER', 7, 7), Entity('MISC', 5, 5)]
+
+    tag_index = {'PER': 0, 'LOC': 1}
+
+    matches = match_document(true_named_entities, pred_named_entities, tag_index)
+
+    # Spurious entities are binned under the predicted type, the others under
+    # the true type, and the MISC entities are not evaluated
+
+    assert match_bins(matches, tag_index) == (
+        0 * 6 + WRONG_TYPE,
+        0 * 6 + SPURIOUS,
+        1 * 6 + MISSED,
+    )
+
+
+def test_compute_metrics_single_token_overlap():
+
+    # End offsets are inclusive, so a single token entity overlaps a
+    # prediction that starts on that token.
+
+    true_named_entities = [Entity('PER', 5, 5)]
+    pred_named_entities = [Entity('PER', 5, 6)]
+
+    results, results_agg = compute_metrics(
+        true_named_entities, pred_named_entities, ['PER']
+    )
+
+    assert results['strict']['incorrect'] == 1
+    assert results['ent_type']['correct'] == 1
+    assert results['partial']['partial'] == 1
+    assert results['strict']['missed'] == 0
+    assert results['strict']['spurious'] == 0
+
+
+def test_compute_metrics_accepts_span_tuples_and_arrays():
+
+    true_named_entities = [Entity('PER', 50, 52), Entity('ORG', 59, 69)]
+    pred_named_entities = [Entity('LOC', 50, 52), Entity('ORG', 59, 69)]
+
+    expected = compute_metrics(true_named_entities, pred_named_entities, ['PER', 'LOC', 'ORG'])
+
+    assert compute_metrics(
+        [('PER', 50, 52), ('ORG', 59, 69)],
+        [('LOC', 50, 52), ('ORG', 59, 69)],
+        ['PER', 'LOC', 'ORG']
+    ) == expected
+
+    assert compute_metrics(
+        entities_from_arrays(['PER', 'ORG'], [50, 59], [52, 69]),
+        entities_from_arrays(['LOC', 'ORG'], [50, 59], [52, 69]),
+        ['PER', 'LOC', 'ORG']
+    ) == expected
+
+
+def test_compute_char_metrics():
+
+    # "Barack Obama visited New York City"
+
+    true_spans = [('PER', 0, 12), ('LOC', 21, 34)]
+
+    pred_spans = [
+        ('PER', 0, 12),     # Exact match
+        ('LOC', 25, 29),    # Overlaps "New York City"
+        ('LOC', 12, 13),    # Only touches "Barack Obama", end is excluded
+    ]
+
+    results, results_agg = compute_char_metrics(true_spans, pred_spans, ['PER', 'LOC'])
+
+    assert results['strict']['correct'] == 1
+    assert results['ent_type']['correct'] == 2
+    assert results['partial']['partial'] == 1
+    assert results['strict']['spurious'] == 1
+    assert results['strict']['missed'] == 0
+
+
+def test_compute_char_metrics_empty_span():
+
+    with pytest.raises(ValueError):
+        compute_char_metrics([('PER', 3, 3)], [], ['PER'])
@@ -0,0 +1,79 @@
+import json
+
+import pytest
+
+from ner_evaluation.ner_eval import Evaluator
+from ner_evaluation.partial import load_partial
+from ner_evaluation.partial import main
+from ner_evaluation.partial import merge_partials
+from ner_evaluation.partial import save_partial
+
+TRUE = [
+    ['O', 'B-PER', 'I-PER', 'O', 'B-LOC'],
+    ['O', 'B-LOC', 'I-LOC', 'O', 'O'],
+    ['B-ORG', 'O', 'O', 'O', 'O'],
+]
+
+PRED = [
+    ['O', 'B-PER', 'I-PER', 'O', 'O'],
+    ['O', 'B-PER', 'I-PER', 'I-PER', 'O'],
+    ['B-ORG', 'I-ORG', 'O', 'O', 'B-LOC'],
+]
+
+
+def test_save_and_load_partial(tmp_path):
+
+    evaluator = Evaluator(TRUE, PRED, tags=['PER', 'LOC', 'ORG'])
+    evaluator.evaluate()
+
+    path = tmp_path / 'partial.json.gz'
+
+    save_partial(path, evaluator.counts, evaluator.tag_index)
+
+    assert load_partial(path) == (evaluator.counts, ['PER', 'LOC', 'ORG'])
+
+
+def test_merge_partials(tmp_path):
+
+    expected = Evaluator(TRUE, PRED, tags=['PER', 'LOC', 'ORG']).evaluate()
+
+    paths = []
+
+    # Each node may list the tags in a different order
+
+    for i, tags in enumerate([['PER', 'LOC', 'ORG'], ['ORG', 'PER', 'LOC'], ['LOC', 'ORG', 'PER']]):
+        evaluator = Evaluator(TRUE[i:i + 1], PRED[i:i + 1], tags=tags)
+        evaluator.evaluate()
+        paths.append(tmp_path / ('node-%d.json' % i))
+        save_partial(paths[-1], evaluator.counts, evaluator.tag_index)
+
+    counts, tags = merge_partials(paths)
+
+    evaluator = Evaluator(tags=tags)
+    evaluator.counts = counts
+
+    assert (evaluator.results, evaluator.evaluation_agg_entities_type) == expected
+
+
+def test_merge_partials_different_tags(tmp_path):
+
+    save_partial(tmp_path / 'a.json', [0] * 6, ['PER'])
+    save_partial(tmp_path / 'b.json', [0] * 6, ['LOC'])
+
+    with pytest.raises(ValueError):
+        merge_partials([tmp_path / 'a.json', tmp_path / 'b.json'])
+
+
+def test_merge_partials_cli(tmp_path, capsys):
+
+    evaluator = Evaluator(TRUE, PRED, tags=['PER', 'LOC', 'ORG'])
+    results, results_agg = evaluator.evaluate()
+
+    save_partial(tmp_path / 'a.json', evaluator.counts, evaluator.tag_index)
+
+    main([str(tmp_path / 'a.json'), str(tmp_path / 'a.json'), '--save', str(tmp_path / 'b.json')])
+
+    output = json.loads(capsys.readouterr().out)
+
+    assert output['results']['strict']['correct'] == 2 * results['strict']['correct']
+    assert load_partial(tmp_path / 'b.json')[0] == [2 * count for count in evaluator.counts]
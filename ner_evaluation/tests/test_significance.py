@@ -0,0 +1,91 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from ner_evaluation.ner_eval import Evaluator
+from ner_evaluation.significance import significance_test
+
+TRUE = [
+    ['O', 'B-PER', 'I-PER', 'O', 'B-LOC'],
+    ['O', 'B-LOC', 'I-LOC', 'O', 'O'],
+    ['B-ORG', 'O', 'O', 'O', 'O'],
+] * 20
+
+GOOD = [
+    ['O', 'B-PER', 'I-PER', 'O', 'B-LOC'],
+    ['O', 'B-LOC', 'I-LOC', 'O', 'O'],
+    ['B-ORG', 'O', 'O', 'O', 'O'],
+] * 20
+
+BAD = [
+    ['O', 'B-PER', 'I-PER', 'O', 'O'],
+    ['O', 'B-PER', 'I-PER', 'I-PER', 'O'],
+    ['B-ORG', 'I-ORG', 'O', 'O', 'B-LOC'],
+] * 20
+
+TAGS = ['PER', 'LOC', 'ORG']
+
+
+@pytest.mark.parametrize('method', ['randomization', 'bootstrap'])
+def test_significant_difference(method):
+
+    results, results_agg = significance_test(
+        TRUE, BAD, GOOD, TAGS, method=method, n_resamples=500, seed=0
+    )
+
+    expected = Evaluator(TRUE, BAD, tags=TAGS).evaluate()[0]
+
+    assert results['strict']['a'] == pytest.approx(expected['strict']['precision'])
+    assert results['strict']['b'] == 1.0
+    assert results['strict']['difference'] > 0
+    assert results['strict']['p_value'] < 0.01
+
+    # Both systems find all the PER entities
+
+    results, results_agg = significance_test(
+        TRUE, BAD, GOOD, TAGS, method=method, metric='recall', n_resamples=100, seed=0
+    )
+
+    assert results_agg['PER']['exact']['difference'] == 0
+    assert results_agg['PER']['exact']['p_value'] == 1.0
+
+
+@pytest.mark.parametrize('method', ['randomization', 'bootstrap'])
+def test_no_difference_with_itself(method):
+
+    results, results_agg = significance_test(
+        TRUE, BAD, BAD, TAGS, method=method, n_resamples=100, seed=0
+    )
+
+    for eval_schema in results:
+        assert results[eval_schema]['difference'] == 0
+        assert results[eval_schema]['p_value'] == 1.0
+
+
+def test_unknown_method():
+
+    with pytest.raises(ValueError):
+        significance_test(TRUE, BAD, GOOD, TAGS, method='foo')
+
+
+@pytest.mark.parametrize('method', ['randomization', 'bootstrap'])
+def test_significance_test_without_documents(method):
+
+    with pytest.raises(ValueError, match="At least one document"):
+        significance_test([], [], [], TAGS, method=method)
+
+
+def test_significance_test_with_scheme():
+
+    true = [['S-PER', 'S-PER', 'O']] * 10
+    pred_a = [['S-PER', 'O', 'O']] * 10
+    pred_b = [['S-PER', 'S-PER', 'O']] * 10
+
+    for scheme in ('BIOES', 'auto'):
+
+        results, _ = significance_test(true, pred_a, pred_b, tags=['PER'], metric='recall',
+                                       n_resamples=200, seed=0, scheme=scheme)
+
+        assert results['strict']['a'] == 0.5
+        assert results['strict']['b'] == 1.0
+        assert results['strict']['p_value'] < 0.05
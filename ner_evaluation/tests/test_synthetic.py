@@ -0,0 +1,110 @@
+import pytest
+
+from ner_evaluation.ner_eval import SCENARIOS
+from ner_evaluation.ner_eval import Evaluator
+from ner_evaluation.ner_eval import collect_named_entities
+from ner_evaluation.ner_eval import compute_metrics
+from ner_evaluation.synthetic import encode_entity
+from ner_evaluation.synthetic import generate_corpus
+from ner_evaluation.synthetic import generate_documents
+
+TAGS = ['T0', 'T1', 'T2']
+
+
+def test_encode_entity():
+
+    assert encode_entity('PER', 3) == ['B-PER', 'I-PER', 'I-PER']
+    assert encode_entity('PER', 2, 'IO') == ['I-PER', 'I-PER']
+    assert encode_entity('PER', 3, 'BIOES') == ['B-PER', 'I-PER', 'E-PER']
+    assert encode_entity('PER', 1, 'BILOU') == ['U-PER']
+
+
+def test_generate_documents_is_seeded():
+
+    first = generate_corpus(50, length=(5, 30), types=TAGS, seed=7)
+
+    assert first == generate_corpus(50, length=(5, 30), types=TAGS, seed=7)
+    assert first != generate_corpus(50, length=(5, 30), types=TAGS, seed=8)
+
+    true, pred = first
+
+    assert len(true) == len(pred) == 50
+    assert all(5 <= len(true_tags) == len(pred_tags) <= 30 for true_tags, pred_tags in zip(true, pred))
+
+
+def test_generate_documents_streams():
+
+    documents = generate_documents(length=10, seed=0)
+
+    for _ in range(3):
+        true_tags, pred_tags = next(documents)
+        assert len(true_tags) == len(pred_tags) == 10
+
+
+def test_generate_documents_errors():
+
+    with pytest.raises(ValueError):
+        next(generate_documents(1, scenarios={'typo': 1.0}))
+
+    with pytest.raises(ValueError):
+        next(generate_documents(1, scenarios={'exact_match': 0}))
+
+    with pytest.raises(ValueError):
+        next(generate_documents(1, types=1))
+
+    assert next(generate_documents(1, types=1, scenarios={'missed': 1.0}, seed=0))
+
+
+@pytest.mark.parametrize('scheme', ['BIO', 'IO', 'BIOES', 'BILOU'])
+def test_evaluator_finds_generated_scenarios(scheme):
+
+    evaluator = Evaluator(tags=TAGS, scheme=scheme)
+    expected = [0] * len(evaluator.counts)
+
+    for true, pred, scenarios in generate_documents(500, length=(1, 40), density=0.3, types=TAGS,
+                                                    scheme=scheme, seed=1, with_scenarios=True):
+        evaluator.update(true, pred)
+
+        for scenario, e_type in scenarios:
+            expected[evaluator.tag_index[e_type] * len(SCENARIOS) + SCENARIOS.index(scenario)] += 1
+
+    assert evaluator.counts == expected
+    assert all(expected)
+
+
+def test_scenario_proportions():
+
+    documents = generate_documents(200, density=0.5, types=TAGS, seed=2, with_scenarios=True,
+                                   scenarios={'spurious': 1.0, 'overlap': 1.0})
+
+    generated = {scenario for _, _, scenarios in documents for scenario, _ in scenarios}
+
+    assert generated == {'spurious', 'overlap'}
+
+
+def test_engines_agree_on_generated_corpus():
+
+    true, pred = generate_corpus(1000, length=(1, 50), density=0.3, types=TAGS, seed=3)
+
+    results, results_agg = Evaluator(true, pred, tags=TAGS).evaluate()
+
+    # compute_metrics, the reference implementation, one document at a time
+
+    totals = {eval_schema: dict.fromkeys(('correct', 'incorrect', 'partial', 'missed'), 0)
+              for eval_schema in results}
+
+    for true_tags, pred_tags in zip(true, pred):
+        document_results, _ = compute_metrics(
+            collect_named_entities(true_tags), collect_named_entities(pred_tags), TAGS
+        )
+        for eval_schema, metrics in totals.items():
+            for metric in metrics:
+                metrics[metric] += document_results[eval_schema][metric]
+
+    for eval_schema, metrics in totals.items():
+        for metric, value in metrics.items():
+            assert results[eval_schema][metric] == value
+
+    pytest.importorskip("numpy")
+
+    assert Evaluator(true, pred, tags=TAGS, engine='numpy').evaluate() == (results, results_agg)
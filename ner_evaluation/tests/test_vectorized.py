@@ -0,0 +1,113 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from ner_evaluation.ner_eval import Evaluator
+from ner_evaluation.vectorized import compute_corpus_counts
+from ner_evaluation.vectorized import compute_document_counts
+from ner_evaluation.vectorized import compute_group_counts
+
+
+def test_numpy_engine_simple_case():
+
+    true = [
+        ['O', 'O', 'B-PER', 'I-PER', 'O'],
+        ['O', 'B-LOC', 'I-LOC', 'B-LOC', 'I-LOC', 'O'],
+    ]
+
+    pred = [
+        ['O', 'O', 'B-PER', 'I-PER', 'O'],
+        ['O', 'B-LOC', 'I-LOC', 'B-LOC', 'I-LOC', 'O'],
+    ]
+
+    evaluator = Evaluator(true, pred, tags=['LOC', 'PER'], engine='numpy')
+
+    results, results_agg = evaluator.evaluate()
+
+    assert results['strict']['correct'] == 3
+    assert results['strict']['precision'] == 1.0
+    assert results_agg['LOC']['exact']['correct'] == 2
+    assert results_agg['PER']['exact']['correct'] == 1
+
+
+def test_numpy_engine_matches_python_engine():
+
+    rng = random.Random(42)
+
+    labels = ['O', 'O', 'O', 'B-PER', 'I-PER', 'B-LOC', 'I-LOC', 'I-ORG', 'B-MISC']
+
+    for _ in range(200):
+
+        true, pred = [], []
+
+        for _ in range(rng.randint(0, 5)):
+            length = rng.randint(0, 12)
+            true.append([rng.choice(labels) for _ in range(length)])
+            pred.append([rng.choice(labels) for _ in range(length)])
+
+        tags = rng.sample(['PER', 'LOC', 'ORG', 'MISC'], rng.randint(1, 4))
+
+        expected = Evaluator(true, pred, tags).evaluate()
+        result = Evaluator(true, pred, tags, engine='numpy').evaluate()
+
+        assert result == expected
+
+
+def test_numpy_engine_wrong_prediction_length():
+
+    true = [
+        ['O', 'B-ORG', 'I-ORG', 'O', 'O'],
+    ]
+
+    pred = [
+        ['O', 'B-MISC', 'I-MISC', 'O'],
+    ]
+
+    with pytest.raises(ValueError):
+        compute_corpus_counts(true, pred, ['ORG', 'MISC'])
+
+
+def test_compute_group_counts():
+
+    rng = random.Random(7)
+
+    labels = ['O', 'O', 'O', 'B-PER', 'I-PER', 'B-LOC', 'I-LOC', 'I-ORG']
+
+    true, pred = [], []
+
+    for _ in range(50):
+        length = rng.randint(0, 12)
+        true.append([rng.choice(labels) for _ in range(length)])
+        pred.append([rng.choice(labels) for _ in range(length)])
+
+    # The last group holds no entity, and still gets a row
+
+    group_ids = [np.arange(50) % 3, np.zeros(50, dtype=np.int64)]
+    group_ids[0][[0, 1]] = 3
+
+    true[0] = pred[0] = true[1] = pred[1] = ['O']
+
+    counts, counts_by_group = compute_group_counts(true, pred, ['PER', 'LOC'], group_ids)
+    document_counts = compute_document_counts(true, pred, ['PER', 'LOC'])
+
+    assert counts == document_counts.sum(axis=0).tolist()
+
+    for ids, group_counts in zip(group_ids, counts_by_group):
+
+        assert group_counts.shape == (ids.max() + 1, 12)
+
+        for group, row in enumerate(group_counts):
+            assert row.tolist() == document_counts[ids == group].sum(axis=0).tolist()
+
+    counts, counts_by_group = compute_group_counts([], [], ['PER'], [np.zeros(0, dtype=np.int64)])
+
+    assert counts == [0] * 6
+    assert counts_by_group[0].shape == (0, 6)
+
+
+def test_unknown_engine():
+
+    with pytest.raises(ValueError):
+        Evaluator([], [], tags=['PER'], engine='foo')
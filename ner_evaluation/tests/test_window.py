@@ -0,0 +1,84 @@
+import pytest
+
+from ner_evaluation.ner_eval import Evaluator
+from ner_evaluation.synthetic import generate_corpus
+from ner_evaluation.window import WindowedEvaluator
+
+TAGS = ['T0', 'T1', 'T2']
+
+
+def test_window_by_size():
+
+    true, pred = generate_corpus(200, length=(1, 30), density=0.3, types=TAGS, seed=7)
+
+    window = WindowedEvaluator(tags=TAGS, size=50)
+
+    for i, (true_tags, pred_tags) in enumerate(zip(true, pred)):
+
+        window.update(true_tags, pred_tags)
+
+        # The same as evaluating the last 50 documents from scratch
+
+        if i % 37 == 0 or i == len(true) - 1:
+            start = max(0, i + 1 - 50)
+            expected = Evaluator(true[start:i + 1], pred[start:i + 1], tags=TAGS)
+            assert window.compute_results() == expected.evaluate()
+            assert window.counts == expected.counts
+
+    assert len(window) == 50
+
+
+def test_window_by_time():
+
+    now = [0.0]
+
+    true = [['B-PER', 'O'], ['B-PER', 'O'], ['O', 'B-LOC']]
+    pred = [['B-PER', 'O'], ['O', 'O'], ['O', 'B-LOC']]
+
+    window = WindowedEvaluator(tags=['PER', 'LOC'], seconds=60, clock=lambda: now[0])
+
+    for t, (true_tags, pred_tags) in zip((0, 30, 50), zip(true, pred)):
+        now[0] = t
+        window.update(true_tags, pred_tags)
+
+    assert window.results['strict']['correct'] == 2
+    assert window.results['strict']['missed'] == 1
+
+    # The first document leaves the window, without any update
+
+    now[0] = 70
+
+    assert window.results['strict']['correct'] == 1
+    assert len(window) == 2
+
+    now[0] = 1000
+
+    assert window.results['strict']['possible'] == 0
+    assert len(window) == 0
+    assert window.counts == [0] * len(window.counts)
+
+
+def test_window_with_timestamps_and_size():
+
+    window = WindowedEvaluator(tags=['PER'], size=2, seconds=10, clock=lambda: 5)
+
+    window.update(['B-PER'], ['B-PER'], timestamp=1)
+    window.update(['B-PER'], ['O'], timestamp=2)
+    window.update(['O'], ['B-PER'], timestamp=3)
+
+    assert len(window) == 2
+    assert window.evaluation_agg_entities_type['PER']['strict']['missed'] == 1
+    assert window.evaluation_agg_entities_type['PER']['strict']['spurious'] == 1
+    assert window.evaluation_agg_entities_type['PER']['strict']['correct'] == 0
+
+
+def test_window_errors():
+
+    with pytest.raises(ValueError):
+        WindowedEvaluator(tags=['PER'])
+
+    with pytest.raises(ValueError):
+        WindowedEvaluator(tags=['PER'], size=0)
+
+    with pytest.raises(ValueError):
+        WindowedEvaluator(tags=['PER'], size=10).update(['B-PER'], ['B-PER', 'O'])
@@ -0,0 +1,362 @@
+"""
+Evaluation of a whole corpus at once with numpy array operations.
+
+The tags of all the documents are interned to integer ids and flattened into
+one contiguous array. Entities are decoded, filtered and matched on that array,
+using global token offsets, so that no Python code runs per token or per
+entity. The counts produced are the same as the ones from compute_metrics.
+"""
+
+from itertools import chain
+
+import numpy as np
+
+from .decoding import tag_rules
+from .ner_eval import EXACT_MATCH, SPURIOUS, MISSED, WRONG_TYPE, OVERLAP, OVERLAP_WRONG_TYPE
+from .ner_eval import SCENARIOS
+from .ner_eval import SCENARIO_METRICS
+from .ner_eval import SCHEMAS
+
+
+class _Vocabulary(dict):
+    """
+    Maps each tag to an integer id, assigning a new id the first time a tag is
+    looked up.
+    """
+
+    def __missing__(self, tag):
+        self[tag] = tag_id = len(self)
+        return tag_id
+
+
+def flatten_corpus(docs, vocabulary):
+    """
+    Interns the tags of all the documents and concatenates them.
+
+    :param docs: a list of documents, each one a list of tags
+    :param vocabulary: a _Vocabulary, updated with any new tag
+    :return: the tag ids and the length of every document
+    """
+
+    lengths = np.fromiter(map(len, docs), dtype=np.int64, count=len(docs))
+
+    tag_ids = np.fromiter(
+        map(vocabulary.__getitem__, chain.from_iterable(docs)),
+        dtype=np.int32,
+        count=int(lengths.sum()),
+    )
+
+    return tag_ids, lengths
+
+
+def decode_entities(tag_ids, doc_starts, is_entity, opens, continues_into, type_ids):
+    """
+    Vectorised equivalent of collect_named_entities, or TagDecoder.decode for
+    the other schemes, over a flattened corpus.
+
+    :param tag_ids: the tag id of every token in the corpus
+    :param doc_starts: boolean array, True for the first token of a document
+    :param is_entity: for each tag id, whether the tag is not 'O'
+    :param opens: for each tag id, whether an entity is still open after it
+    :param continues_into: for each tag id, whether it continues an open entity
+        of its type, see decoding.tag_rules
+    :param type_ids: for each tag id, the id of its entity type
+    :return: the type ids, start offsets and end offsets of the entities, with
+        offsets into the flattened corpus
+    """
+
+    entity = is_entity[tag_ids]
+    types = type_ids[tag_ids]
+
+    # A token starts an entity when it is not 'O' and it does not continue the
+    # entity of the previous token: at the start of a document, after an 'O' or
+    # a tag closing its entity, on a change of type, or on a 'B' tag.
+
+    continues = np.zeros_like(entity)
+    continues[1:] = opens[tag_ids[:-1]] & (types[1:] == types[:-1])
+    continues &= ~doc_starts & continues_into[tag_ids]
+
+    starts = entity & ~continues
+
+    # A token ends an entity when the next token does not continue it.
+
+    ends = np.zeros_like(entity)
+    ends[:-1] = ~continues[1:]
+    ends[-1:] = True
+    ends &= entity
+
+    start_offsets = np.flatnonzero(starts)
+    end_offsets = np.flatnonzero(ends)
+
+    return types[start_offsets], start_offsets, end_offsets
+
+
+def match_entities(true_types, true_starts, true_ends, pred_types, pred_starts, pred_ends):
+    """
+    Vectorised equivalent of the matching done in compute_metrics.
+
+    True entities must be sorted and must not overlap, which is always the
+    case for entities decoded from tags.
+
+    :return: the scenario of each predicted entity, the index of the true
+        entity it was matched against (-1 if none), and a boolean array
+        marking the true entities that were matched by some prediction
+    """
+
+    n_pred = len(pred_starts)
+
+    # The true entities that can match a prediction are a contiguous run: the
+    # ones ending after the prediction starts and starting before it ends.
+
+    first = np.searchsorted(true_ends, pred_starts, side='left')
+    last = np.searchsorted(true_starts, pred_ends, side='right')
+    n_candidates = np.maximum(last - first, 0)
+
+    # Expand every (pred, candidate true) pair, grouped by prediction and in
+    # order of the true entities within each group.
+
+    pair_pred = np.repeat(np.arange(n_pred), n_candidates)
+    group_offsets = np.cumsum(n_candidates) - n_candidates
+    pair_true = first[pair_pred] + np.arange(len(pair_pred)) - group_offsets[pair_pred]
+
+    same_offsets = (true_starts[pair_true] == pred_starts[pair_pred]) & \
+                   (true_ends[pair_true] == pred_ends[pair_pred])
+    same_type = true_types[pair_true] == pred_types[pair_pred]
+
+    # Offsets are inclusive, see intervals.overlap
+
+    overlap = np.maximum(true_starts[pair_true], pred_starts[pair_pred]) <= \
+        np.minimum(true_ends[pair_true], pred_ends[pair_pred])
+
+    scenarios = np.full(n_pred, SPURIOUS, dtype=np.int64)
+    matched_true = np.full(n_pred, -1, dtype=np.int64)
+
+    # Scenarios IV, V and VI: the first true entity with the same offsets or
+    # an overlap wins.
+
+    qualifying = np.flatnonzero(same_offsets | overlap)
+    preds, first_pair = np.unique(pair_pred[qualifying], return_index=True)
+    first_pair = qualifying[first_pair]
+
+    scenarios[preds] = np.where(
+        same_offsets[first_pair],
+        WRONG_TYPE,
+        np.where(same_type[first_pair], OVERLAP, OVERLAP_WRONG_TYPE),
+    )
+    matched_true[preds] = pair_true[first_pair]
+
+    # Scenario I takes precedence over all the others
+
+    exact = np.flatnonzero(same_offsets & same_type)
+    scenarios[pair_pred[exact]] = EXACT_MATCH
+    matched_true[pair_pred[exact]] = pair_true[exact]
+
+    was_matched = np.zeros(len(true_starts), dtype=bool)
+    was_matched[matched_true[matched_true >= 0]] = True
+
+    return scenarios, matched_true, was_matched
+
+
+def _scenario_bins(true, pred, tags, scheme='BIO'):
+    """
+    Matches the entities of a whole corpus.
+
+    :return: for every predicted and every missed true entity, its bin in the
+        flat counts expected by compute_results_from_counts and the index of its
+        document
+    """
+
+    if len(true) != len(pred):
+        raise ValueError("Number of predicted documents does not equal true")
+
+    vocabulary = _Vocabulary()
+
+    true_ids, true_lengths = flatten_corpus(true, vocabulary)
+    pred_ids, pred_lengths = flatten_corpus(pred, vocabulary)
+
+    if not np.array_equal(true_lengths, pred_lengths):
+        raise ValueError("Prediction length does not match true example length")
+
+    n_scenarios = len(SCENARIOS)
+
+    # Per tag id lookup tables, so that no string operation is done per token.
+    # Types which are not being evaluated get the id -1.
+
+    tag_index = {e_type: i for i, e_type in enumerate(dict.fromkeys(tags))}
+    entity_types = _Vocabulary()
+
+    is_entity = np.array([tag != 'O' for tag in vocabulary], dtype=bool)
+    rules = np.array([tag_rules(tag, scheme) for tag in vocabulary], dtype=bool).reshape(-1, 2)
+    type_ids = np.array([entity_types[tag[2:]] for tag in vocabulary], dtype=np.int64)
+    type_rows = np.array([tag_index.get(e_type, -1) for e_type in entity_types], dtype=np.int64)
+
+    doc_offsets = np.cumsum(true_lengths) - true_lengths
+
+    doc_starts = np.zeros(len(true_ids), dtype=bool)
+    doc_starts[doc_offsets[true_lengths > 0]] = True
+
+    def entities(tag_ids):
+        types, starts, ends = decode_entities(
+            tag_ids, doc_starts, is_entity, rules[:, 0], rules[:, 1], type_ids
+        )
+        rows = type_rows[types]
+        keep = rows >= 0
+        return rows[keep], starts[keep], ends[keep]
+
+    true_rows, true_starts, true_ends = entities(true_ids)
+    pred_rows, pred_starts, pred_ends = entities(pred_ids)
+
+    scenarios, matched_true, was_matched = match_entities(
+        true_rows, true_starts, true_ends, pred_rows, pred_starts, pred_ends
+    )
+
+    # Exact matches and spurious entities are counted against the predicted
+    # type, all the other scenarios against the true type.
+
+    rows = np.where(matched_true >= 0, true_rows[np.maximum(matched_true, 0)], pred_rows) \
+        if len(true_rows) else pred_rows
+
+    missed = ~was_matched
+
+    bins = np.concatenate([
+        rows * n_scenarios + scenarios,
+        true_rows[missed] * n_scenarios + MISSED,
+    ])
+
+    starts = np.concatenate([pred_starts, true_starts[missed]])
+    docs = np.searchsorted(doc_offsets, starts, side='right') - 1
+
+    return bins, docs
+
+
+def compute_corpus_counts(true, pred, tags, scheme='BIO'):
+    """
+    Computes the scenario counts of a whole corpus.
+
+    :param true: a list of documents, each one a list of true tags
+    :param pred: a list of documents, each one a list of predicted tags
+    :param tags: the entity types to evaluate
+    :param scheme: the tagging scheme, one of decoding.SCHEMES
+    :return: a flat list of counts, as expected by compute_results_from_counts
+    """
+
+    bins, docs = _scenario_bins(true, pred, tags, scheme)
+
+    counts = np.bincount(bins, minlength=len(dict.fromkeys(tags)) * len(SCENARIOS))
+
+    return counts.tolist()
+
+
+def compute_document_counts(true, pred, tags, scheme='BIO'):
+    """
+    Computes the scenario counts of every document in a corpus.
+
+    :param true: a list of documents, each one a list of true tags
+    :param pred: a list of documents, each one a list of predicted tags
+    :param tags: the entity types to evaluate
+    :param scheme: the tagging scheme, one of decoding.SCHEMES
+    :return: an array with one row per document, each one laid out as expected
+        by compute_results_from_counts
+    """
+
+    bins, docs = _scenario_bins(true, pred, tags, scheme)
+
+    n_counts = len(dict.fromkeys(tags)) * len(SCENARIOS)
+
+    counts = np.bincount(docs * n_counts + bins, minlength=len(true) * n_counts)
+
+    return counts.reshape(len(true), n_counts)
+
+
+def compute_group_counts(true, pred, tags, group_ids, scheme='BIO'):
+    """
+    Computes the scenario counts of a corpus, and of each group of its
+    documents, without holding the counts of every document.
+
+    :param true: a list of documents, each one a list of true tags
+    :param pred: a list of documents, each one a list of predicted tags
+    :param tags: the entity types to evaluate
+    :param group_ids: a list of integer arrays, each one giving the group of
+        every document, numbered from 0, for one way of grouping them
+    :param scheme: the tagging scheme, one of decoding.SCHEMES
+    :return: the flat counts of the corpus, as expected by
+        compute_results_from_counts, and for each array of group_ids, an
+        array with the counts of each group, one row per group
+    """
+
+    bins, docs = _scenario_bins(true, pred, tags, scheme)
+
+    n_counts = len(dict.fromkeys(tags)) * len(SCENARIOS)
+
+    group_counts = []
+
+    for ids in group_ids:
+
+        n_groups = int(ids.max()) + 1 if len(ids) else 0
+
+        counts = np.bincount(ids[docs] * n_counts + bins, minlength=n_groups * n_counts)
+        group_counts.append(counts.reshape(n_groups, n_counts))
+
+    return np.bincount(bins, minlength=n_counts).tolist(), group_counts
+
+
+def _schema_weights():
+    """
+    Linear maps from scenario counts to the numerator of precision and recall,
+    actual and possible, of each schema.
+
+    :return: three arrays of shape (len(SCENARIOS), len(SCHEMAS))
+    """
+
+    n_scenarios = len(SCENARIOS)
+
+    numerator = np.zeros((n_scenarios, len(SCHEMAS)))
+    actual = np.zeros((n_scenarios, len(SCHEMAS)))
+    possible = np.zeros((n_scenarios, len(SCHEMAS)))
+
+    for j, eval_schema in enumerate(SCHEMAS):
+        for scenario, metric in enumerate(SCENARIO_METRICS[eval_schema]):
+
+            # See compute_precision_recall: partial matches count half in the
+            # partial and ent_type schemas.
+
+            if metric == 'correct':
+                numerator[scenario, j] = 1
+            elif metric == 'partial' and eval_schema in ('partial', 'ent_type'):
+                numerator[scenario, j] = 0.5
+
+            actual[scenario, j] = metric != 'missed'
+            possible[scenario, j] = metric != 'spurious'
+
+    return numerator, actual, possible
+
+
+def compute_scores(counts, n_tags):
+    """
+    Vectorised precision, recall and F1 for any number of sets of counts.
+
+    :param counts: an array of shape (..., n_tags * len(SCENARIOS)), each row
+        laid out as expected by compute_results_from_counts
+    :param n_tags: the number of entity types in the counts
+    :return: the precision, recall and F1 arrays, of shape
+        (..., n_tags + 1, len(SCHEMAS)), where the first row holds the overall
+        scores and the others the scores of each entity type
+    """
+
+    counts = np.asarray(counts, dtype=np.float64)
+    counts = counts.reshape(counts.shape[:-1] + (n_tags, len(SCENARIOS)))
+
+    # As in compute_results_from_counts, spurious entities are applied to all
+    # the entity types.
+
+    rows = np.concatenate([counts.sum(axis=-2, keepdims=True), counts], axis=-2)
+    rows[..., SPURIOUS] = counts[..., SPURIOUS].sum(axis=-1, keepdims=True)
+
+    numerator, actual, possible = (rows @ weights for weights in _schema_weights())
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        precision = np.where(actual > 0, numerator / actual, 0.0)
+        recall = np.where(possible > 0, numerator / possible, 0.0)
+        f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+
+    return precision, recall, f1
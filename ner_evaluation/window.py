@@ -0,0 +1,140 @@
+"""
+Metrics over a sliding window of the most recent documents, for monitoring a
+live system on a sample of its labelled traffic:
+
+    window = WindowedEvaluator(tags=['LOC', 'PER'], size=1000, seconds=3600)
+
+    for true_ents, pred_ents in labelled_traffic:
+        window.update(true_ents, pred_ents)
+        report(window.results['strict']['precision'])
+
+Each document is kept in a ring buffer as the bins of the counts its entities
+were added to, so that it is subtracted from the running counts when it leaves
+the window. Updating and evicting a document costs time proportional to its
+number of entities, whatever the size of the window, and results are computed
+from the running counts alone.
+"""
+
+import time
+from collections import deque
+
+from .ner_eval import Evaluator
+from .ner_eval import compute_results_from_counts
+from .ner_eval import match_bins
+from .ner_eval import match_document
+
+
+class WindowedEvaluator():
+
+    def __init__(self, tags, size=None, seconds=None, clock=time.time, input_format='tags',
+                 scheme='BIO'):
+        """
+        :param tags: the entity types to evaluate
+        :param size: the maximum number of documents in the window
+        :param seconds: the maximum age of the documents in the window
+        :param clock: the function giving the current time, in seconds
+        :param input_format: how documents are given, see Evaluator
+        :param scheme: the tagging scheme of the documents, see Evaluator
+        """
+
+        if size is None and seconds is None:
+            raise ValueError("The window must be bounded by a size, a duration, or both")
+
+        if size is not None and size < 1:
+            raise ValueError("The window must hold at least one document")
+
+        self.size = size
+        self.seconds = seconds
+        self.clock = clock
+
+        # The evaluator decodes documents, and holds the running counts of the
+        # documents in the window.
+
+        self.evaluator = Evaluator(tags=tags, input_format=input_format, scheme=scheme)
+        self.tag_index = self.evaluator.tag_index
+        self.counts = self.evaluator.counts
+
+        # (timestamp, bins) of each document in the window, oldest first
+
+        self.window = deque()
+
+    def __len__(self):
+        return len(self.window)
+
+    def update(self, true_ents, pred_ents, timestamp=None):
+        """
+        Adds a document to the window, evicting the documents which leave it.
+
+        :param true_ents: the true tags, or spans, of the document
+        :param pred_ents: the predicted tags, or spans, of the document
+        :param timestamp: the time of the document, by default the current time
+        """
+
+        if timestamp is None:
+            timestamp = self.clock()
+
+        true_named_entities, pred_named_entities = self.evaluator.decode_entities(
+            true_ents, pred_ents
+        )
+
+        matches = match_document(true_named_entities, pred_named_entities, self.tag_index)
+        bins = match_bins(matches, self.tag_index)
+
+        counts = self.counts
+
+        for i in bins:
+            counts[i] += 1
+
+        self.window.append((timestamp, bins))
+
+        self.evict(timestamp)
+
+    def evict(self, now=None):
+        """
+        Removes the documents which are no longer in the window.
+
+        :param now: the current time, by default given by the clock
+        """
+
+        window = self.window
+        counts = self.counts
+
+        if self.seconds is not None:
+
+            if now is None:
+                now = self.clock()
+
+            while window and window[0][0] <= now - self.seconds:
+                for i in window.popleft()[1]:
+                    counts[i] -= 1
+
+        if self.size is not None:
+            while len(window) > self.size:
+                for i in window.popleft()[1]:
+                    counts[i] -= 1
+
+    def compute_results(self):
+        """
+        :return: the overall results and the results by entity type of the
+            documents currently in the window
+        """
+
+        self.evict()
+
+        return compute_results_from_counts(self.counts, self.tag_index)
+
+    @property
+    def results(self):
+        """
+        The overall results of the documents currently in the window.
+        """
+
+        return self.compute_results()[0]
+
+    @property
+    def evaluation_agg_entities_type(self):
+        """
+        The results by entity type of the documents currently in the window.
+        """
+
+        return self.compute_results()[1]